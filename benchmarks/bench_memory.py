@@ -0,0 +1,70 @@
+"""Measures memory used by parsed documents in bytes per node.
+
+    python benchmarks/bench_memory.py
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namumark import Interner, Parser  # noqa: E402
+from namumark.elements import Element  # noqa: E402
+
+from pages import corpus_pages, mixed_page, prose_page  # noqa: E402
+
+
+def count_nodes(document):
+    count = 0
+    stack = [document]
+    while stack:
+        element = stack.pop()
+        count += 1
+        stack.extend(child for child in element if isinstance(child, Element))
+    return count
+
+
+def bench(name, source):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    document = Parser().parse(source)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Texts are shared with nothing else, so exclude them from the node size
+    texts = 0
+    stack = [document]
+    while stack:
+        element = stack.pop()
+        for child in element:
+            if isinstance(child, Element):
+                stack.append(child)
+            else:
+                texts += sys.getsizeof(child)
+
+    nodes = count_nodes(document)
+    print('{:<8} {:>8} nodes {:>8.1f} bytes/node'.format(name, nodes, (after - before - texts) / nodes))
+
+
+def bench_corpus(name, interner=None):
+    sources = list(corpus_pages())
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    documents = [Parser().parse(source, interner=interner) for source in sources]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('{:<8} {:>8} pages {:>8.1f} KiB/page'.format(name, len(documents), (after - before) / len(documents) / 1024))
+
+
+if __name__ == '__main__':
+    bench('prose', prose_page())
+    bench('mixed', mixed_page())
+    bench_corpus('corpus')
+    bench_corpus('interned', Interner())
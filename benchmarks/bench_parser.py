@@ -0,0 +1,27 @@
+"""Measures parsing throughput in lines per second.
+
+    python benchmarks/bench_parser.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namumark import Parser  # noqa: E402
+
+from pages import deep_list_page, mixed_page, nested_page, prose_page, talk_page  # noqa: E402
+
+
+def bench(name, source, repeat=5):
+    lines = source.count('\n') + 1
+    seconds = min(timeit.repeat(lambda: Parser().parse(source), number=1, repeat=repeat))
+    print('{:<8} {:>8} lines {:>12,.0f} lines/sec'.format(name, lines, lines / seconds))
+
+
+if __name__ == '__main__':
+    bench('prose', prose_page())
+    bench('mixed', mixed_page())
+    bench('nested', nested_page())
+    bench('talk', talk_page())
+    bench('deeplist', deep_list_page())
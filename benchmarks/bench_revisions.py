@@ -0,0 +1,41 @@
+"""Measures parsing and diffing a revision history with and without a BlockMemo.
+
+    python benchmarks/bench_revisions.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namumark import BlockMemo, Parser, diff  # noqa: E402
+
+from pages import mixed_page, prose_page, revisions  # noqa: E402
+
+
+def bench(name, source, count=100):
+    history = list(revisions(source, count))
+
+    started = time.perf_counter()
+    documents = [Parser().parse(revision) for revision in history]
+    plain = time.perf_counter() - started
+
+    memo = BlockMemo()
+    started = time.perf_counter()
+    memoized_documents = [Parser().parse(revision, memo=memo) for revision in history]
+    memoized = time.perf_counter() - started
+
+    print('{:<8} {:>4} revisions {:>10.1f} ms (parse) {:>10.1f} ms (memo, {} hits, {} misses)'.format(
+        name, count, plain * 1000, memoized * 1000, memo.hits, memo.misses))
+
+    # Documents parsed with a memo share hashes of unchanged blocks
+    for label, parsed in [('diff', documents), ('diff memo', memoized_documents)]:
+        started = time.perf_counter()
+        changes = sum(len(diff(old, new)) for old, new in zip(parsed, parsed[1:]))
+        elapsed = time.perf_counter() - started
+        print('{:<8} {:>10.1f} ms ({}, {} changes)'.format('', elapsed * 1000, label, changes))
+
+
+if __name__ == '__main__':
+    bench('prose', prose_page())
+    bench('mixed', mixed_page())
@@ -0,0 +1,46 @@
+"""Compares loading a document from the binary format against pickle and re-parsing.
+
+    python benchmarks/bench_serialization.py
+"""
+import os
+import pickle
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namumark import Parser  # noqa: E402
+from namumark.elements import Document  # noqa: E402
+
+from pages import mixed_page, nested_page, prose_page, talk_page  # noqa: E402
+
+
+def measure(function, repeat=5):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def bench(name, source):
+    document = Parser().parse(source)
+    encoded = document.to_bytes()
+    pickled = pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print('{:<8} {:>10,} bytes (binary) {:>10,} bytes (pickle) {:>10,} bytes (source)'.format(
+        name, len(encoded), len(pickled), len(source.encode('utf-8'))))
+    print('{:<8} {:>10.2f} ms (from_bytes) {:>8.2f} ms (pickle) {:>8.2f} ms (parse)'.format(
+        '',
+        measure(lambda: Document.from_bytes(encoded)) * 1000,
+        measure(lambda: pickle.loads(pickled)) * 1000,
+        measure(lambda: Parser().parse(source)) * 1000,
+    ))
+    print('{:<8} {:>10.2f} ms (to_bytes) {:>10.2f} ms (pickle)'.format(
+        '',
+        measure(document.to_bytes) * 1000,
+        measure(lambda: pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)) * 1000,
+    ))
+
+
+if __name__ == '__main__':
+    bench('prose', prose_page())
+    bench('mixed', mixed_page())
+    bench('nested', nested_page())
+    bench('talk', talk_page())
@@ -0,0 +1,35 @@
+"""Measures throughput of parsing a corpus with one shared parser in threads.
+Threads run in parallel only on a free-threaded build of CPython.
+
+    python benchmarks/bench_threads.py
+"""
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import namumark  # noqa: E402
+
+from pages import corpus_pages  # noqa: E402
+
+
+def bench(threads, pages):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(namumark.parse, pages):
+            pass
+    seconds = time.perf_counter() - started
+
+    print('{:>2} threads {:>10,.0f} pages/sec'.format(threads, len(pages) / seconds))
+
+
+if __name__ == '__main__':
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('GIL enabled' if gil else 'GIL disabled')
+
+    pages = list(corpus_pages(2000, seed=0))
+    for threads in [1, 2, 4, 8]:
+        bench(threads, pages)
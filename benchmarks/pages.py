@@ -0,0 +1,102 @@
+"""Synthetic namu.wiki-like pages used by benchmarks"""
+import random
+
+WORDS = (
+    '나무위키 문서 위키 the of and 개요 역사 설명 특징 with from 대한민국 '
+    '서울 이 그 저 for to in 작품 인물 등장 설정 평가 기타'
+).split()
+
+
+def sentence(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 24)))
+
+
+def prose_page(sections=50, paragraphs=8, seed=0):
+    """A page mostly made of plain paragraphs under headings"""
+    rng = random.Random(seed)
+
+    lines = []
+    for section in range(sections):
+        lines.append('== {} =='.format(sentence(rng)[:20].strip()))
+        for _ in range(paragraphs):
+            lines.extend(sentence(rng) for _ in range(rng.randint(1, 4)))
+            lines.append('')
+    return '\n'.join(lines)
+
+
+def mixed_page(sections=50, seed=0):
+    """A page mixing paragraphs, quotes, lists and indentations"""
+    rng = random.Random(seed)
+
+    lines = []
+    for section in range(sections):
+        lines.append('== {} =='.format(sentence(rng)[:20].strip()))
+        lines.extend(sentence(rng) for _ in range(3))
+        lines.extend('> ' + sentence(rng) for _ in range(2))
+        lines.extend(' * ' + sentence(rng) for _ in range(3))
+        lines.extend('  * ' + sentence(rng) for _ in range(2))
+        lines.extend(' 1. ' + sentence(rng) for _ in range(3))
+        lines.append(' ' + sentence(rng))
+        lines.append('----')
+    return '\n'.join(lines)
+
+
+def nested_page(depth=50, repeat=20):
+    """A page made of deeply nested lists and quotes"""
+    lines = []
+    for _ in range(repeat):
+        lines.extend(' ' * level + '* item {}'.format(level) for level in range(1, depth + 1))
+        lines.extend('>' * level + ' quote {}'.format(level) for level in range(1, depth + 1))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def deep_list_page(depth=200, repeat=10):
+    """A page made of very deeply nested unordered and ordered lists"""
+    lines = []
+    for _ in range(repeat):
+        lines.extend(' ' * level + '* item {}'.format(level) for level in range(1, depth + 1))
+        lines.extend(' ' * level + '1. item {}'.format(level) for level in range(depth, 0, -1))
+    return '\n'.join(lines)
+
+
+def talk_page(threads=40, depth=30, seed=0):
+    """A talk page made of long lines in deeply nested quotes and indentations"""
+    rng = random.Random(seed)
+
+    lines = []
+    for _ in range(threads):
+        for level in range(1, depth + 1):
+            text = ' '.join(sentence(rng) for _ in range(10))
+            lines.append('>' * level + ' ' + text)
+            lines.append(' ' * level + text)
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def revisions(source, count=100, seed=0):
+    """Revisions of a given page, each of which changes a random line of the previous one"""
+    rng = random.Random(seed)
+
+    lines = source.split('\n')
+    for _ in range(count):
+        number = rng.randrange(len(lines))
+        lines[number] = lines[number] + ' ' + rng.choice(WORDS)
+        yield '\n'.join(lines)
+
+
+def corpus_pages(count=200, seed=0):
+    """Short pages sharing boilerplate headings, thematic breaks and template paragraphs"""
+    rng = random.Random(seed)
+    templates = [sentence(rng) for _ in range(20)]
+    headings = ['== 개요 ==', '== 역사 ==', '== 특징 ==', '== 평가 ==', '== 기타 ==', '== 같이 보기 ==']
+
+    for _ in range(count):
+        lines = []
+        for heading in headings:
+            lines.append(heading)
+            for _ in range(4):
+                lines.append(rng.choice(templates) if rng.random() < 0.5 else sentence(rng))
+                lines.append('')
+            lines.append('----')
+        yield '\n'.join(lines)
@@ -1,4 +1,12 @@
+from . import dump
 from . import elements
+from . import events
 from . import specs
 
-from .parser import Parser
+from .parser import Edit, Parser, parse
+from .batch import parse_many
+from .cache import CachingParser
+from .memo import BlockMemo
+from .diff import diff
+from .interning import Interner
+from .prescan import HeadingIndex
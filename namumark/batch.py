@@ -0,0 +1,97 @@
+import itertools
+import os
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .parser import Parser
+
+
+def parse_many(sources, workers=None, chunksize=16, ordered=True, max_pending=None, arena=False):
+    """Parse given sources in a pool of worker processes.
+
+    Sources are sent to workers in chunks of a given size, and at most
+    max_pending chunks (twice the number of workers by default) are in flight
+    at once, so sources are consumed lazily and memory stays flat.
+    Workers send documents back as ArenaDocuments, which are pickled as flat
+    arrays instead of deep Element graphs.
+
+    If ordered, documents are yielded in input order.
+    Otherwise, (index, document) pairs are yielded as they complete.
+    If arena is True, ArenaDocuments are yielded instead of Documents
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+
+    chunks = _chunk(sources, chunksize)
+    convert = _as_arena if arena else _to_document
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if max_pending is None:
+            max_pending = (workers or os.cpu_count() or 1) * 2
+
+        if ordered:
+            results = _iterate_ordered(executor, chunks, max_pending)
+            for _, documents in results:
+                for document in documents:
+                    yield convert(document)
+        else:
+            results = _iterate_completed(executor, chunks, max_pending)
+            for start, documents in results:
+                for index, document in enumerate(documents, start):
+                    yield index, convert(document)
+
+
+def _chunk(sources, chunksize):
+    """Split given sources into (index of the first source, sources) pairs"""
+    iterator = iter(sources)
+
+    start = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+
+        yield start, chunk
+        start += len(chunk)
+
+
+def _iterate_ordered(executor, chunks, max_pending):
+    pending = deque()
+    for start, chunk in chunks:
+        pending.append((start, executor.submit(_parse_chunk, chunk)))
+        if len(pending) >= max_pending:
+            start, future = pending.popleft()
+            yield start, future.result()
+
+    while pending:
+        start, future = pending.popleft()
+        yield start, future.result()
+
+
+def _iterate_completed(executor, chunks, max_pending):
+    pending = {}
+    for start, chunk in chunks:
+        pending[executor.submit(_parse_chunk, chunk)] = start
+        if len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
+
+
+def _parse_chunk(sources):
+    parser = Parser()
+    return [parser.parse_arena(source) for source in sources]
+
+
+def _as_arena(arena):
+    return arena
+
+
+def _to_document(arena):
+    return arena.to_document()
@@ -0,0 +1,127 @@
+import hashlib
+import os
+
+from collections import OrderedDict
+
+from .elements import Document
+from .elements.serialization import VERSION
+from .files import write_atomically
+from .parser import Parser
+from .specs import registry_version
+
+
+class CachingParser:
+    """A parser which caches documents by the content of their sources.
+
+    Documents are kept encoded by Document.to_bytes in an LRU cache bounded by
+    the number of entries and their total size in bytes, so that every call
+    returns a new document which callers are free to modify.
+    If a directory is given, encoded documents are also written to it and
+    read back when they are evicted from memory or the process is restarted.
+
+    Keys include the version of registered specifications and of the encoding,
+    so entries written by a different version are never used.
+
+    Hits are counted for entries in memory and disk hits for entries on disk,
+    while misses are counted for sources which are actually parsed
+    """
+
+    def __init__(self, parser=None, max_entries=1024, max_bytes=64 * 1024 * 1024, directory=None):
+        self.parser = parser or Parser()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+
+        self._entries = OrderedDict()  # key -> encoded document
+        self._size = 0
+        self._version = '{}:{}'.format(registry_version(), VERSION).encode('ascii')
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def parse(self, source):
+        key = self.key_of(source)
+
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return Document.from_bytes(data)
+
+        data = self._read(key)
+        if data is not None:
+            try:
+                document = Document.from_bytes(data)
+            except ValueError:  # A partially written or corrupted entry
+                pass
+            else:
+                self.disk_hits += 1
+                self._store(key, data)
+                return document
+
+        self.misses += 1
+
+        document = self.parser.parse(source)
+        data = document.to_bytes()
+        self._write(key, data)
+        self._store(key, data)
+
+        return document
+
+    def key_of(self, source):
+        """Returns a key of a given source in the cache"""
+        digest = hashlib.sha256(self._version)
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+
+        return digest.hexdigest()
+
+    def clear(self):
+        """Remove every entry in memory. Entries on disk are kept"""
+        self._entries.clear()
+        self._size = 0
+
+    @property
+    def size(self):
+        """Approximate number of bytes of entries in memory"""
+        return self._size
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+
+        self._entries[key] = data
+        self._size += len(data)
+
+        while (len(self._entries) > self.max_entries) or (self._size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _path_of(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path_of(key), 'rb') as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return None
+
+        return data
+
+    def _write(self, key, data):
+        if self.directory is None:
+            return
+
+        path = self._path_of(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomically(path, data)
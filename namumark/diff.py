@@ -0,0 +1,85 @@
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+from .elements import Element
+
+INSERT = 'insert'
+REMOVE = 'remove'
+CHANGE = 'change'
+
+# Indices are of children of the old and the new element. An inserted block
+# has no old block, and its old index is where it is inserted, and vice versa
+Change = namedtuple('Change', ['operation', 'old_index', 'new_index', 'old', 'new'])
+
+
+def diff(old, new):
+    """Compare children of given elements, such as two revisions of a document,
+    and returns a list of Changes in order. Children are compared by their
+    structural hashes, so identical blocks are skipped without visiting their
+    descendants. A block replaced by one of the same type is reported as changed,
+    and the others as removed or inserted
+    """
+    old_hashes = [hash_of(child) for child in old]
+    new_hashes = [hash_of(child) for child in new]
+
+    # Most revisions change only a few blocks in the middle
+    prefix = 0
+    limit = min(len(old_hashes), len(new_hashes))
+    while (prefix < limit) and (old_hashes[prefix] == new_hashes[prefix]):
+        prefix += 1
+
+    suffix = 0
+    limit -= prefix
+    while (suffix < limit) and (old_hashes[-suffix - 1] == new_hashes[-suffix - 1]):
+        suffix += 1
+
+    old_end = len(old_hashes) - suffix
+    new_end = len(new_hashes) - suffix
+
+    matcher = SequenceMatcher(None, old_hashes[prefix:old_end], new_hashes[prefix:new_end], autojunk=False)
+
+    changes = []
+    for operation, old_start, old_stop, new_start, new_stop in matcher.get_opcodes():
+        if operation == 'equal':
+            continue
+
+        changes.extend(_changes_between(
+            old.children, range(prefix + old_start, prefix + old_stop),
+            new.children, range(prefix + new_start, prefix + new_stop)))
+
+    return changes
+
+
+def hash_of(child):
+    if isinstance(child, Element):
+        return child.structural_hash()
+
+    return hash(child)
+
+
+def _changes_between(old_children, old_indices, new_children, new_indices):
+    """Pair replaced children of the same type in order as changed"""
+    changes = []
+
+    position = 0
+    for old_index in old_indices:
+        old_child = old_children[old_index]
+
+        # Find the next new child of the same type
+        for index in range(position, len(new_indices)):
+            new_index = new_indices[index]
+            if type(new_children[new_index]) is type(old_child):
+                for inserted in new_indices[position:index]:
+                    changes.append(Change(INSERT, old_index, inserted, None, new_children[inserted]))
+                changes.append(Change(CHANGE, old_index, new_index, old_child, new_children[new_index]))
+                position = index + 1
+                break
+        else:
+            removed_at = new_indices[position] if position < len(new_indices) else new_indices.stop
+            changes.append(Change(REMOVE, old_index, removed_at, old_child, None))
+
+    insert_at = old_indices.stop
+    for inserted in new_indices[position:]:
+        changes.append(Change(INSERT, insert_at, inserted, None, new_children[inserted]))
+
+    return changes
@@ -0,0 +1,305 @@
+"""Ingestion of a namu.wiki dump, a JSON array of records such as
+{"namespace": ..., "title": ..., "text": ..., ...}, in bounded memory.
+
+The array is decoded record by record, texts are parsed by parse_many in worker
+processes, and documents are written to a sink as they come back in order.
+Progress can be saved to a checkpoint file by the byte offset of the last record
+written, so that an interrupted ingestion resumes after it
+"""
+import abc
+import codecs
+import json
+import os
+import time
+
+from collections import deque
+
+from .batch import parse_many
+from .elements import Document, Element, walk
+from .elements.serialization import read_varint, write_varint
+from .files import write_atomically
+
+WHITESPACE = ' \t\n\r'
+
+# A decoding error this close to the end of a buffer may be due to a value cut
+# by the end, such as a literal or an escape sequence of a surrogate pair
+TRUNCATION_MARGIN = 16
+
+
+def iter_records(fp, offset=0, chunk_size=1 << 20):
+    """Yield (offset, record) for each record of a JSON array in a given binary
+    file object, where offset is the byte offset of the file right after the record.
+    If a given offset is not 0, decoding starts there as right after a record
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    fp.seek(offset)
+    buffer = ''
+    position = 0  # in the buffer
+    mark = 0  # a position in the buffer at the offset
+    eof = False
+
+    expected = '[' if offset == 0 else ','
+    while True:
+        # Skip whitespace and read more if the buffer runs out
+        while (position < len(buffer)) and (buffer[position] in WHITESPACE):
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise ValueError('Unexpected end of a dump at byte {}'.format(offset))
+
+            buffer, position, mark, eof = _read_more(fp, utf8, buffer, position, mark, chunk_size)
+            continue
+
+        character = buffer[position]
+        if expected == '[':
+            if character != '[':
+                raise ValueError('A dump should be a JSON array')
+            position += 1
+            expected = 'record'
+            continue
+
+        if character == ']':
+            return
+
+        if expected == ',':
+            if character != ',':
+                raise ValueError('Expected a comma at byte {}'.format(offset))
+            position += 1
+            expected = 'record'
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            # Only a record cut at the end of the buffer may continue after it
+            truncated = (error.pos >= len(buffer) - TRUNCATION_MARGIN) or error.msg.startswith('Unterminated string')
+            if eof or not truncated:
+                raise ValueError('Malformed record at byte {}: {}'.format(
+                    offset + len(buffer[mark:error.pos].encode('utf-8')), error.msg)) from None
+
+            buffer, position, mark, eof = _read_more(
+                fp, utf8, buffer, position, mark, max(chunk_size, len(buffer) - position))
+            continue
+
+        offset += len(buffer[mark:end].encode('utf-8'))
+        position = mark = end
+        expected = ','
+
+        yield offset, record
+
+
+def _read_more(fp, decoder, buffer, position, mark, size):
+    """Drop consumed characters of a given buffer and append a chunk
+    read from a given file object to it
+    """
+    data = fp.read(size)
+    text = decoder.decode(data, final=not data)
+
+    return buffer[mark:] + text, position - mark, 0, not data
+
+
+def to_json(element):
+    """Convert a given element into a dict of its type, attributes and
+    children, which are dicts or texts, so that it can be encoded to JSON
+    """
+    converted = {}  # id of an element -> its dict
+
+    root = None
+    for node, parent in walk(element):
+        if isinstance(node, Element):
+            value = {'type': type(node).__name__}
+            value.update(node.attributes())
+            value['children'] = []
+            converted[id(node)] = value
+        else:
+            value = node
+
+        if parent is None:
+            root = value
+        else:
+            converted[id(parent)]['children'].append(value)
+
+    return root
+
+
+class Sink(abc.ABC):
+    """A file that parsed records are appended to. Records written after
+    the last checkpoint are truncated when an ingestion resumes
+    """
+
+    def __init__(self, path):
+        self.fp = open(path, 'ab')
+
+    @abc.abstractmethod
+    def write(self, record, document):
+        """Write a given record without its text and its document"""
+
+    def tell(self):
+        return self.fp.tell()
+
+    def truncate(self, position):
+        self.fp.truncate(position)
+        self.fp.seek(position)
+
+    def flush(self):
+        self.fp.flush()
+
+    def close(self):
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLinesSink(Sink):
+    """Writes each record as a line of JSON with its document converted by to_json"""
+
+    def write(self, record, document):
+        value = {key: value for key, value in record.items() if key != 'text'}
+        value['document'] = to_json(document)
+
+        # Non-ASCII characters are escaped, as texts may hold lone surrogates
+        self.fp.write(json.dumps(value).encode('ascii'))
+        self.fp.write(b'\n')
+
+
+class BinarySink(Sink):
+    """Writes each record as its JSON encoded without its text and
+    its document encoded by Document.to_bytes, both prefixed by their lengths
+    as varints. iter_binary reads them back
+    """
+
+    def write(self, record, document):
+        metadata = json.dumps({key: value for key, value in record.items() if key != 'text'}).encode('ascii')
+        data = document.to_bytes()
+
+        output = bytearray()
+        write_varint(output, len(metadata))
+        output += metadata
+        write_varint(output, len(data))
+        output += data
+
+        self.fp.write(output)
+
+
+def iter_binary(fp):
+    """Yield (record, document) pairs written by BinarySink
+    to a given binary file object, reading one pair at a time
+    """
+    while True:
+        metadata = _read_prefixed(fp)
+        if metadata is None:
+            return
+
+        data = _read_prefixed(fp)
+        if data is None:
+            raise ValueError('Truncated data')
+
+        yield json.loads(metadata.decode('utf-8')), Document.from_bytes(data)
+
+
+def _read_prefixed(fp):
+    """Read bytes prefixed by their length as a varint,
+    or returns None at the end of a given file object
+    """
+    prefix = bytearray()
+    while True:
+        byte = fp.read(1)
+        if not byte:
+            if prefix:
+                raise ValueError('Truncated data')
+            return None
+
+        prefix += byte
+        if not (byte[0] & 0x80):
+            break
+
+    length, _ = read_varint(prefix, 0)
+    data = fp.read(length)
+    if len(data) != length:
+        raise ValueError('Truncated data')
+
+    return data
+
+
+class IngestStats:
+    """Throughput of an ingestion since it started or resumed"""
+
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0  # of the dump
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def records_per_second(self):
+        return self.records / (self.elapsed or 1e-9)
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / (self.elapsed or 1e-9)
+
+    def __repr__(self):
+        return 'IngestStats(records={}, bytes={}, {:.0f} records/sec, {:.0f} bytes/sec)'.format(
+            self.records, self.bytes, self.records_per_second, self.bytes_per_second)
+
+
+def ingest(path, sink, checkpoint=None, checkpoint_every=1000, progress=None,
+           workers=None, chunksize=64, max_pending=None):
+    """Parse texts of records in a dump at a given path, and write them
+    to a given Sink in order. Returns IngestStats.
+
+    Records are read only as fast as workers of parse_many parse them, since
+    at most max_pending chunks of chunksize records are in flight at once.
+    If a checkpoint path is given, the offsets of the dump and the sink after
+    the last record written are saved to it every checkpoint_every records
+    and at the end, and an ingestion with an existing checkpoint resumes there.
+    A given progress function is called with IngestStats at every checkpoint
+    """
+    offset = 0
+    if (checkpoint is not None) and os.path.exists(checkpoint):
+        with open(checkpoint, encoding='utf-8') as fp:
+            state = json.load(fp)
+
+        offset = state['offset']
+        sink.truncate(state['output'])
+
+    stats = IngestStats()
+    records = deque()  # (offset, record) of texts being parsed
+
+    def save():
+        sink.flush()
+        if checkpoint is not None:
+            state = {'offset': offset + stats.bytes, 'output': sink.tell()}
+            write_atomically(checkpoint, json.dumps(state).encode('ascii'))
+        if progress is not None:
+            progress(stats)
+
+    with open(path, 'rb') as fp:
+        def texts():
+            for end, record in iter_records(fp, offset):
+                records.append((end, record))
+                text = record.get('text')
+                yield text if isinstance(text, str) else ''
+
+        for document in parse_many(texts(), workers=workers, chunksize=chunksize, max_pending=max_pending):
+            end, record = records.popleft()
+            sink.write(record, document)
+
+            stats.records += 1
+            stats.bytes = end - offset
+            if not stats.records % checkpoint_every:
+                save()
+
+    if stats.records % checkpoint_every or not stats.records:
+        save()
+
+    return stats
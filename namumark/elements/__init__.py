@@ -1 +1,4 @@
 from .blocks import *
+from .arena import ArenaDocument, ArenaNode
+from .sections import Section, SectionIndex
+from .traversal import iter_depths, iter_type, postorder, preorder, walk
@@ -0,0 +1,303 @@
+from array import array
+
+from .blocks import *
+from .element import Element
+
+# Kinds are indices into kind_table. Texts are kept as nodes of their own kind
+TEXT = 0
+kind_table = (
+    str,
+    Document,
+    Heading,
+    Quote,
+    Paragraph,
+    UnorderedList,
+    OrderedList,
+    ListItem,
+    Indentation,
+    ThematicBreak,
+)
+kind_of_class = {cls: kind for kind, cls in enumerate(kind_table)}
+
+NONE = -1  # an index pointing to no node
+
+# The range of OrderedList.start kept in an array, as the syntax allows any number of digits
+START_MIN = -(1 << 63)
+START_MAX = (1 << 63) - 1
+
+
+class ArenaDocument:
+    """A document whose nodes are kept in parallel typed arrays instead of
+    Element objects. Nodes are stored in document order, so the root is
+    node 0 and a node always comes after its ancestors. Texts are spans
+    into a single string buffer.
+
+    ArenaNode provides an Element-compatible view of each node
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.last_children = array('i')
+        self.next_siblings = array('i')
+        self.closed = array('B')
+
+        # Attributes of blocks: Heading.level, OrderedList.start and OrderedList.bullet
+        self.levels = array('B')
+        self.starts = array('q')
+        self.large_starts = {}  # index -> OrderedList.start out of the range of starts
+        self.bullets = array('B')  # ASCII code, or 0 if none
+
+        # Spans of texts in the buffer
+        self.text_starts = array('i')
+        self.text_ends = array('i')
+
+        self._buffer = ''
+        self._pieces = []
+        self._length = 0
+
+        self._add_node(Document(), NONE)
+
+    @classmethod
+    def from_document(cls, document):
+        """Create an arena from a given document"""
+        arena = cls()
+        arena.closed[0] = document.closed
+        for child in document:
+            arena.append(child)
+
+        return arena
+
+    @property
+    def root(self):
+        return ArenaNode(self, 0)
+
+    @property
+    def buffer(self):
+        """A string which all texts of this document are sliced from"""
+        if self._pieces:
+            self._buffer += ''.join(self._pieces)
+            self._pieces.clear()
+
+        return self._buffer
+
+    def append(self, block, parent=0):
+        """Append a given block and its descendants as a last child of
+        a given parent node, and returns the index of the block node
+        """
+        index = len(self.kinds)
+
+        stack = [(block, parent)]
+        while stack:
+            element, parent = stack.pop()
+            node = self._add_node(element, parent)
+
+            if isinstance(element, Element):
+                stack.extend((child, node) for child in reversed(element.children))
+
+        return index
+
+    def iter_nodes(self, element_class):
+        """Iterate nodes of a given element class in document order.
+        This scans only the kind array
+        """
+        kind = kind_of_class[element_class]
+        kinds = self.kinds.tobytes()
+
+        index = kinds.find(kind)
+        while index != NONE:
+            yield ArenaNode(self, index)
+            index = kinds.find(kind, index + 1)
+
+    def text(self, index):
+        """Returns the text of a given text node"""
+        return self.buffer[self.text_starts[index]:self.text_ends[index]]
+
+    def to_document(self):
+        """Materialize this arena into Element objects"""
+        return self.root.to_element()
+
+    def _add_node(self, element, parent):
+        kind = kind_of_class.get(type(element))
+        if kind is None:
+            raise ValueError('{} cannot be stored in an arena'.format(type(element).__name__))
+
+        index = len(self.kinds)
+
+        self.kinds.append(kind)
+        self.parents.append(parent)
+        self.first_children.append(NONE)
+        self.last_children.append(NONE)
+        self.next_siblings.append(NONE)
+
+        if parent != NONE:
+            if self.first_children[parent] == NONE:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[self.last_children[parent]] = index
+            self.last_children[parent] = index
+
+        if kind == TEXT:
+            self.closed.append(0)
+            self.text_starts.append(self._length)
+            self._pieces.append(element)
+            self._length += len(element)
+            self.text_ends.append(self._length)
+        else:
+            self.closed.append(element.closed)
+            self.text_starts.append(0)
+            self.text_ends.append(0)
+
+        self.levels.append(getattr(element, 'level', 0))
+        start = getattr(element, 'start', 0)
+        if not (START_MIN <= start <= START_MAX):
+            self.large_starts[index] = start
+            start = 0
+        self.starts.append(start)
+        bullet = getattr(element, 'bullet', None)
+        self.bullets.append(ord(bullet) if bullet else 0)
+
+        return index
+
+    def __getstate__(self):
+        self.buffer  # join pending pieces into the buffer
+
+        return self.__dict__
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __eq__(self, other):
+        if isinstance(other, ArenaDocument):
+            other = other.to_document()
+
+        return self.to_document() == other
+
+
+class ArenaNode:
+    """An Element-compatible view of a node in an ArenaDocument"""
+
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def element_class(self):
+        return kind_table[self.arena.kinds[self.index]]
+
+    @property
+    def parent(self):
+        parent = self.arena.parents[self.index]
+        return ArenaNode(self.arena, parent) if parent != NONE else None
+
+    @property
+    def children(self):
+        return list(self)
+
+    @property
+    def first_child(self):
+        return self._view(self.arena.first_children[self.index])
+
+    @property
+    def last_child(self):
+        return self._view(self.arena.last_children[self.index])
+
+    @property
+    def closed(self):
+        return bool(self.arena.closed[self.index])
+
+    def attributes(self):
+        """Returns public attributes of this node as Element.attributes does"""
+        arena = self.arena
+
+        attributes = {'closed': self.closed}
+        if 'level' in self.element_class._fields:
+            attributes['level'] = arena.levels[self.index]
+        if 'start' in self.element_class._fields:
+            attributes['start'] = arena.large_starts.get(self.index, arena.starts[self.index])
+        if 'bullet' in self.element_class._fields:
+            attributes['bullet'] = chr(arena.bullets[self.index])
+
+        return attributes
+
+    def to_element(self):
+        """Materialize this node and its descendants into Element objects"""
+        root = self._create_element(self.index)
+
+        stack = [(self.index, root)]
+        while stack:
+            index, element = stack.pop()
+
+            child = self.arena.first_children[index]
+            while child != NONE:
+                child_element = self._create_element(child)
+                element.append(child_element)
+                if isinstance(child_element, Element):
+                    stack.append((child, child_element))
+
+                child = self.arena.next_siblings[child]
+
+        return root
+
+    def dump(self, indent=2):
+        return self.to_element().dump(indent)
+
+    def _create_element(self, index):
+        arena = self.arena
+
+        kind = arena.kinds[index]
+        if kind == TEXT:
+            return arena.text(index)
+
+        element = kind_table[kind].__new__(kind_table[kind])
+        Element.__init__(element)
+        for name, value in ArenaNode(arena, index).attributes().items():
+            setattr(element, name, value)
+
+        return element
+
+    def _view(self, index):
+        if index == NONE:
+            return None
+
+        if self.arena.kinds[index] == TEXT:
+            return self.arena.text(index)
+
+        return ArenaNode(self.arena, index)
+
+    def __getattr__(self, name):
+        if name in ArenaNode.__slots__:
+            raise AttributeError(name)
+
+        attributes = self.attributes()
+        if name not in attributes:
+            raise AttributeError(name)
+
+        return attributes[name]
+
+    def __iter__(self):
+        child = self.arena.first_children[self.index]
+        while child != NONE:
+            yield self._view(child)
+            child = self.arena.next_siblings[child]
+
+    def __eq__(self, other):
+        if isinstance(other, ArenaNode):
+            other = other.to_element()
+
+        return self.to_element() == other
+
+    def __repr__(self):
+        mappings = [
+            '{}={}'.format(key, repr(value))
+            for key, value in sorted(self.attributes().items())
+        ]
+
+        return '{name}@{index}({mappings})'.format(
+            name=self.element_class.__name__,
+            index=self.index,
+            mappings=', '.join(mappings)
+        )
@@ -1,7 +1,10 @@
+from . import serialization
 from .element import Element
 
 
 class Block(Element):
+    __slots__ = ('closed',)
+
     def __init__(self, *children):
         super().__init__(*children)
 
@@ -10,10 +13,61 @@ class Block(Element):
 
 
 class Document(Block):
-    pass
+    # Source lines and the first line of each child are kept for Parser.reparse.
+    # Section lines are (an array of (index of a child, line number) pairs of
+    # headings, the number of lines) recorded by parsers to index sections on demand
+    __slots__ = ('_lines', '_line_starts', '_section_lines', '_sections', '_truncated')
+
+    def __init__(self, *children):
+        super().__init__(*children)
+
+        self._lines = None
+        self._line_starts = None
+        self._section_lines = None
+        self._sections = None
+        self._truncated = False
+
+    @property
+    def truncated(self):
+        """Whether parsing stopped before the end of the source"""
+        return getattr(self, '_truncated', False)
+
+    @property
+    def sections(self):
+        """A SectionIndex of top-level headings, built from children on first access.
+        Line numbers of sections are known if the document is parsed from a source
+        """
+        sections = getattr(self, '_sections', None)
+        if sections is None:
+            lines = getattr(self, '_lines', None)
+            if lines is not None:
+                line_starts, line_count = self._line_starts, len(lines)
+            else:
+                heading_lines, line_count = getattr(self, '_section_lines', None) or ((), None)
+                line_starts = dict(zip(heading_lines[::2], heading_lines[1::2]))
+
+            sections = self._sections = SectionIndex.from_document(self, line_starts, line_count)
+            self._section_lines = None
+
+        return sections
+
+    def to_bytes(self):
+        """Encode this document into a compact binary format"""
+        return serialization.encode(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a document encoded by to_bytes"""
+        document = serialization.decode(data)
+        if not isinstance(document, cls):
+            raise ValueError('Not an encoded {}'.format(cls.__name__))
+
+        return document
 
 
 class Heading(Block):
+    __slots__ = ('level',)
+
     def __init__(self, level, *children):
         super().__init__(*children)
 
@@ -22,22 +76,24 @@ class Heading(Block):
 
 
 class Quote(Block):
-    pass
+    __slots__ = ()
 
 
 class Paragraph(Block):
-    pass
+    __slots__ = ()
 
 
 class List(Block):
-    pass
+    __slots__ = ()
 
 
 class UnorderedList(List):
-    pass
+    __slots__ = ()
 
 
 class OrderedList(List):
+    __slots__ = ('start', 'bullet')
+
     def __init__(self, start, bullet, *children):
         super().__init__(*children)
 
@@ -46,15 +102,21 @@ class OrderedList(List):
 
 
 class ListItem(Block):
-    pass
+    __slots__ = ()
 
 
 class Indentation(Block):
-    pass
+    __slots__ = ()
 
 
 class ThematicBreak(Block):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
         self.closed = True
+
+
+# SectionIndex refers to Heading
+from .sections import SectionIndex  # noqa: E402
@@ -1,7 +1,25 @@
+from .traversal import iter_depths
+
+
 class Element:
+    __slots__ = ('parent', 'children', '_hash')
+
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Public attributes compared by __eq__ and shown by __repr__
+        names = set()
+        for klass in cls.__mro__:
+            names.update(klass.__dict__.get('__slots__', ()))
+        names -= {'parent', 'children'}
+        cls._fields = tuple(sorted(name for name in names if not name.startswith('_')))
+
     def __init__(self, *children):
         self.parent = None
-        self.children = []
+        self.children = ()  # A list is allocated when a child is appended
+        self._hash = None  # A structural hash computed on demand
 
         for child in children:
             self.append(child)
@@ -11,7 +29,13 @@ class Element:
         if isinstance(element, Element):
             element.parent = self
 
-        self.children.append(element)
+        if self.children:
+            self.children.append(element)
+        else:
+            self.children = [element]
+
+        if self._hash is not None:
+            self.invalidate_hash()
         return self
 
     def prepend(self, element):
@@ -19,7 +43,13 @@ class Element:
         if isinstance(element, Element):
             element.parent = self
 
-        self.children.insert(0, element)
+        if self.children:
+            self.children.insert(0, element)
+        else:
+            self.children = [element]
+
+        if self._hash is not None:
+            self.invalidate_hash()
         return self
 
     def wrap(self, element):
@@ -31,18 +61,117 @@ class Element:
 
         return element
 
-    def dump(self, indent=2):
-        def do_dump(element, depth=0):
-            yield '{indent}{element}'.format(
-                indent=' ' * (indent * depth),
-                element=repr(element)
-            )
+    def copy(self):
+        """Returns a deep copy of this element without its parent.
+        Texts are shared as they are immutable
+        """
+        root = self._copy_node()
+
+        stack = [(self, root)]
+        while stack:
+            original, copied = stack.pop()
+            if not original.children:
+                continue
+
+            children = []
+            for child in original.children:
+                if isinstance(child, Element):
+                    child_copy = child._copy_node()
+                    child_copy.parent = copied
+                    stack.append((child, child_copy))
+                    child = child_copy
+                children.append(child)
+            copied.children = children
+
+        return root
+
+    def _copy_node(self):
+        """Returns a copy of this element without its parent and children"""
+        cls = type(self)
+
+        node = cls.__new__(cls)
+        node.parent = None
+        node.children = ()
+        node._hash = self._hash  # Descendants are copied as they are
+        for name in self._fields:
+            setattr(node, name, getattr(self, name))
+        if hasattr(self, '__dict__'):
+            node.__dict__.update(self.__dict__)
+
+        return node
+
+    def structural_hash(self):
+        """Returns a hash of the type, attributes and descendants of this element.
+        Equal elements have the same hash, except that closed is not hashed.
+        Hashes are kept until this element or its descendants are changed
+        """
+        if self._hash is not None:
+            return self._hash
+
+        # Hash descendants first from the deepest ones
+        stack = [(self, False)]
+        while stack:
+            element, visited = stack.pop()
+            if visited:
+                element._hash = hash((
+                    type(element),
+                    element._hashed_attributes(),
+                    tuple(
+                        child._hash if isinstance(child, Element) else hash(child)
+                        for child in element.children
+                    ),
+                ))
+            elif element._hash is None:
+                stack.append((element, True))
+                stack.extend(
+                    (child, False) for child in element.children
+                    if isinstance(child, Element)
+                )
+
+        return self._hash
+
+    def invalidate_hash(self):
+        """Forget structural hashes of this element and its ancestors.
+        This should be called after changing attributes or children directly
+        """
+        element = self
+        while (element is not None) and (element._hash is not None):
+            element._hash = None
+            element = element.parent
+
+    def _hashed_attributes(self):
+        attributes = self.attributes()
+        attributes.pop('closed', None)  # Parsers close blocks after they are built
+
+        return tuple(sorted(attributes.items()))
+
+    def dump(self, indent=2, stream=None):
+        """Returns a readable representation of this element and its descendants.
+        If a writable stream is given, lines are written to it one by one instead
+        """
+        lines = (
+            '{indent}{node}'.format(indent=' ' * (indent * depth), node=repr(node))
+            for node, depth in iter_depths(self)
+        )
+
+        if stream is None:
+            return '\n'.join(lines)
+
+        stream.write(next(lines))
+        for line in lines:
+            stream.write('\n')
+            stream.write(line)
+
+    def attributes(self):
+        """Returns public attributes of this element except parent and children"""
+        attributes = {name: getattr(self, name) for name in self._fields}
 
-            if isinstance(element, Element):
-                for child in element:
-                    yield from do_dump(child, depth + 1)
+        # Subclasses without __slots__ keep their own attributes in __dict__
+        for name, value in getattr(self, '__dict__', {}).items():
+            if not name.startswith('_'):
+                attributes[name] = value
 
-        return '\n'.join(do_dump(self))
+        return attributes
 
     @property
     def first_child(self):
@@ -56,26 +185,42 @@ class Element:
         return iter(self.children)
 
     def __eq__(self, other):
-        if type(self) is not type(other):
-            return False
+        # Let views of elements, such as ArenaNode, compare themselves
+        if not isinstance(other, Element):
+            return NotImplemented
+
+        # Descendants are compared without recursion, so that deep elements can be compared
+        stack = [(self, other)]
+        while stack:
+            mine, others = stack.pop()
+            if type(mine) is not type(others):
+                return False
+
+            if not isinstance(mine, Element):
+                if mine != others:
+                    return False
+                continue
+
+            # Different hashes mean different elements, if both are known
+            if (mine._hash is not None) and (others._hash is not None) and (mine._hash != others._hash):
+                return False
 
-        mine = dict(vars(self))
-        del mine['parent']
+            if mine.attributes() != others.attributes():
+                return False
 
-        others = dict(vars(other))
-        del others['parent']
+            if len(mine.children) != len(others.children):
+                return False
+            stack.extend(zip(mine.children, others.children))
 
-        return mine == others
+        return True
 
     def __repr__(self):
         identifier = '{:04x}'.format(id(self))
 
-        keys = vars(self).keys()
-        keys -= {'parent', 'children'}
-        keys = filter(lambda key: not key.startswith('_'), keys)
+        attributes = self.attributes()
         mappings = [
-            '{}={}'.format(key, repr(getattr(self, key)))
-            for key in sorted(keys)
+            '{}={}'.format(key, repr(attributes[key]))
+            for key in sorted(attributes)
         ]
 
         return '{name}#{identifier}({mappings})'.format(
@@ -0,0 +1,147 @@
+from .blocks import Heading
+
+
+class Section:
+    """A top-level heading and the blocks following it until a heading of
+    the same or a higher level. start and stop are indices of children of
+    the document, and line_start and line_stop are line numbers of the source
+    if known. path is the numbering of the heading, such as (1, 2, 3)
+    """
+
+    __slots__ = ('heading', 'level', 'path', 'start', 'stop', 'line_start', 'line_stop')
+
+    def __init__(self, heading, path, start, line_start):
+        self.heading = heading
+        self.level = heading.level
+        self.path = path
+        self.start = start
+        self.stop = None
+        self.line_start = line_start
+        self.line_stop = None
+
+    @property
+    def title(self):
+        return ''.join(child for child in self.heading if isinstance(child, str))
+
+    @property
+    def number(self):
+        return '.'.join(str(number) for number in self.path)
+
+    def __repr__(self):
+        return 'Section({number} {title!r}, children={start}:{stop}, lines={line_start}:{line_stop})'.format(
+            number=self.number,
+            title=self.title,
+            start=self.start,
+            stop=self.stop,
+            line_start=self.line_start,
+            line_stop=self.line_stop,
+        )
+
+
+class SectionIndex:
+    """Sections of a document in order, which can be looked up
+    by their numbering paths and titles
+    """
+
+    def __init__(self):
+        self._sections = []
+        self._by_path = {}
+        self._by_title = {}
+
+        self._open = []  # sections which can contain the next heading
+        self._numbers = []  # [level, number] of each numbering depth
+
+    @classmethod
+    def from_document(cls, document, line_starts=None, line_count=None):
+        """Index top-level headings of a given document"""
+        index = cls()
+        for child_index, child in enumerate(document.children):
+            if isinstance(child, Heading):
+                index.add(child, child_index, _line_of(line_starts, child_index))
+        index.finish(len(document.children), line_count)
+
+        return index
+
+    def add(self, heading, start, line_start=None):
+        """Add a given heading starting a section at given indices"""
+        level = heading.level
+
+        # Close sections of the same or deeper levels
+        while self._open and (self._open[-1].level >= level):
+            self._close(self._open.pop(), start, line_start)
+
+        # A heading following deeper ones continues their numbering
+        # if there is no heading of its level, as in levels 2, 4 and 3
+        numbers = self._numbers
+        popped = None
+        while numbers and (numbers[-1][0] > level):
+            popped = numbers.pop()
+        if numbers and (numbers[-1][0] == level):
+            numbers[-1][1] += 1
+        else:
+            numbers.append([level, popped[1] + 1 if popped else 1])
+
+        section = Section(heading, tuple(number for _, number in numbers), start, line_start)
+        self._sections.append(section)
+        self._by_path[section.path] = section
+        self._open.append(section)
+
+        return section
+
+    def pop(self):
+        """Remove the last section added"""
+        section = self._sections.pop()
+        del self._by_path[section.path]
+        if self._open and (self._open[-1] is section):
+            self._open.pop()
+
+        return section
+
+    def finish(self, stop, line_stop=None):
+        """Close all sections at the end of a document"""
+        while self._open:
+            self._close(self._open.pop(), stop, line_stop)
+
+        # Texts of headings are incorporated after headings are added
+        for section in self._sections:
+            self._by_title.setdefault(section.title, section)
+
+    def by_path(self, path):
+        """Returns a section of a given numbering path such as (1, 2) or '1.2' if exists"""
+        if isinstance(path, str):
+            try:
+                path = tuple(int(number) for number in path.split('.'))
+            except ValueError:
+                return None
+
+        return self._by_path.get(tuple(path))
+
+    def by_title(self, title):
+        """Returns the first section of a given title if exists"""
+        return self._by_title.get(title)
+
+    def _close(self, section, stop, line_stop):
+        section.stop = stop
+        section.line_stop = line_stop
+
+    def __getitem__(self, index):
+        return self._sections[index]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+
+def _line_of(line_starts, child_index):
+    """Returns the line of a child in given line starts, a list or a dict by indices
+    of children, or None for a child added after the line starts are recorded
+    """
+    if not line_starts:
+        return None
+
+    try:
+        return line_starts[child_index]
+    except (IndexError, KeyError):
+        return None
@@ -0,0 +1,297 @@
+"""A compact binary encoding of element trees.
+
+An encoded tree is laid out as follows, where every number is a varint:
+
+    magic, version
+    kind table: count, then (class name, count, attribute names...) per kind
+    string table: count, UTF-8 bytes of all strings joined, where lone
+                  surrogates are encoded as if they were characters, then
+                  the length of each string in characters
+    nodes in document order
+
+A node is its kind, where kind 0 is a text node followed by its index into
+the string table. Any other kind is followed by flags, its attribute values
+in the order of the kind table and the number of its children.
+An attribute value is a tagged varint, (payload << 2) | tag.
+"""
+from .element import Element
+
+MAGIC = b'NMKB'
+VERSION = 1
+
+TEXT = 0
+
+# Flags of a node
+CLOSED = 1
+
+# Tags of an attribute value
+INTEGER = 0  # a zigzag-encoded integer
+STRING = 1  # an index into the string table
+NONE = 2
+BOOLEAN = 3
+
+
+class Encoder:
+    def __init__(self):
+        self.kinds = {}  # (class, attribute names) -> kind
+        self.strings = {}  # string -> index
+        self.nodes = bytearray()
+
+    def encode(self, root):
+        self.encode_tree(root)
+
+        output = bytearray(MAGIC)
+        write_varint(output, VERSION)
+
+        write_varint(output, len(self.kinds))
+        for cls, names in self.kinds:
+            write_string(output, cls.__name__)
+            write_varint(output, len(names))
+            for name in names:
+                write_string(output, name)
+
+        write_varint(output, len(self.strings))
+        write_string(output, ''.join(self.strings))
+        for string in self.strings:
+            write_varint(output, len(string))
+
+        output += self.nodes
+        return bytes(output)
+
+    def encode_tree(self, root):
+        nodes = self.nodes
+
+        stack = [root]
+        while stack:
+            element = stack.pop()
+
+            if not isinstance(element, Element):
+                nodes.append(TEXT)
+                write_varint(nodes, self.intern(element))
+                continue
+
+            attributes = element.attributes()
+            closed = attributes.pop('closed', False)
+            names = tuple(attributes)
+
+            write_varint(nodes, self.kind_of(type(element), names))
+            nodes.append(CLOSED if closed else 0)
+            for name in names:
+                write_varint(nodes, self.tag(attributes[name]))
+            write_varint(nodes, len(element.children))
+
+            stack.extend(reversed(element.children))
+
+    def kind_of(self, cls, names):
+        key = (cls, names)
+
+        kind = self.kinds.get(key)
+        if kind is None:
+            kind = self.kinds[key] = len(self.kinds) + 1  # 0 is for texts
+
+        return kind
+
+    def intern(self, string):
+        index = self.strings.get(string)
+        if index is None:
+            index = self.strings[string] = len(self.strings)
+
+        return index
+
+    def tag(self, value):
+        if value is None:
+            return NONE
+        if isinstance(value, bool):
+            return (int(value) << 2) | BOOLEAN
+        if isinstance(value, int):
+            zigzag = (value << 1) if value >= 0 else ((-value << 1) - 1)
+            return (zigzag << 2) | INTEGER
+        if isinstance(value, str):
+            return (self.intern(value) << 2) | STRING
+
+        raise ValueError('{} cannot be encoded'.format(type(value).__name__))
+
+
+def encode(root):
+    """Encode a given element and its descendants into bytes"""
+    return Encoder().encode(root)
+
+
+def decode(data):
+    """Decode an element encoded by encode"""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    try:
+        return read_tree(data)
+    except IndexError:
+        raise ValueError('Truncated data') from None
+
+
+def read_tree(data):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not an encoded element')
+
+    position = len(MAGIC)
+    version, position = read_varint(data, position)
+    if version != VERSION:
+        raise ValueError('Unsupported version: {}'.format(version))
+
+    classes = classes_by_name()
+
+    count, position = read_varint(data, position)
+    kinds = [None]
+    for _ in range(count):
+        name, position = read_string(data, position)
+        if name not in classes:
+            raise ValueError('Unknown element: {}'.format(name))
+
+        cls = classes[name]
+
+        size, position = read_varint(data, position)
+        names = []
+        for _ in range(size):
+            attribute, position = read_string(data, position)
+            if attribute not in cls._fields:
+                raise ValueError('Unknown attribute of {}: {}'.format(name, attribute))
+            names.append(attribute)
+
+        kinds.append((cls, names, hasattr(cls, 'closed')))
+
+    count, position = read_varint(data, position)
+    joined, position = read_string(data, position)
+    strings = []
+    offset = 0
+    for _ in range(count):
+        length = data[position]
+        position += 1
+        if length & 0x80:
+            length, position = read_varint(data, position - 1)
+
+        strings.append(joined[offset:offset + length])
+        offset += length
+
+    def value_of(tagged):
+        tag, payload = tagged & 3, tagged >> 2
+        if tag == INTEGER:
+            return (payload >> 1) if not (payload & 1) else -((payload + 1) >> 1)
+        if tag == STRING:
+            return strings[payload]
+        if tag == NONE:
+            return None
+
+        return bool(payload)
+
+    root = None
+    stack = []  # [element, the number of remaining children]
+    end = len(data)
+    while position < end:
+        # Varints below are mostly a single byte, so read them inline
+        kind = data[position]
+        position += 1
+        if kind & 0x80:
+            kind, position = read_varint(data, position - 1)
+
+        if kind == TEXT:
+            index = data[position]
+            position += 1
+            if index & 0x80:
+                index, position = read_varint(data, position - 1)
+
+            node = strings[index]
+            children = 0
+        else:
+            cls, names, closable = kinds[kind]
+            node = cls.__new__(cls)
+            node.parent = None
+            node.children = ()
+            node._hash = None
+            if closable:
+                node.closed = bool(data[position] & CLOSED)
+            position += 1
+
+            for name in names:
+                tagged = data[position]
+                position += 1
+                if tagged & 0x80:
+                    tagged, position = read_varint(data, position - 1)
+                setattr(node, name, value_of(tagged))
+
+            children = data[position]
+            position += 1
+            if children & 0x80:
+                children, position = read_varint(data, position - 1)
+
+        if stack:
+            top = stack[-1]
+            parent = top[0]
+            if parent.children:
+                parent.children.append(node)
+            else:
+                parent.children = [node]
+            if kind != TEXT:
+                node.parent = parent
+
+            top[1] -= 1
+            if not top[1]:
+                stack.pop()
+        elif root is None:
+            root = node
+        else:
+            raise ValueError('Trailing data after the root element')
+
+        if children:
+            stack.append([node, children])
+
+    if (root is None) or stack:
+        raise ValueError('Truncated data')
+
+    return root
+
+
+def classes_by_name():
+    """Returns every subclass of Element by its name"""
+    classes = {}
+
+    stack = [Element]
+    while stack:
+        cls = stack.pop()
+        classes.setdefault(cls.__name__, cls)
+        stack.extend(cls.__subclasses__())
+
+    return classes
+
+
+def write_varint(output, value):
+    while value >= 0x80:
+        output.append((value & 0x7f) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+
+        value |= (byte & 0x7f) << shift
+        if not (byte & 0x80):
+            return value, position
+        shift += 7
+
+
+def write_string(output, string):
+    # Texts may hold lone surrogates, such as ones decoded from JSON escapes
+    encoded = string.encode('utf-8', 'surrogatepass')
+    write_varint(output, len(encoded))
+    output += encoded
+
+
+def read_string(data, position):
+    length, position = read_varint(data, position)
+    if position + length > len(data):
+        raise ValueError('Truncated data')
+
+    return data[position:position + length].decode('utf-8', 'surrogatepass'), position + length
@@ -0,0 +1,59 @@
+"""Traversals of element trees with explicit stacks, so that deep trees
+never hit the recursion limit. Texts are visited as nodes without children
+"""
+
+
+def preorder(root):
+    """Yield a given element and its descendants in document order"""
+    for node, _ in walk(root):
+        yield node
+
+
+def postorder(root):
+    """Yield descendants of a given element and then the element,
+    so that every node comes after its children
+    """
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited or isinstance(node, str) or not node.children:
+            yield node
+            continue
+
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
+
+
+def iter_type(root, element_class):
+    """Yield a given element and its descendants of a given class in document order"""
+    for node, _ in walk(root):
+        if isinstance(node, element_class):
+            yield node
+
+
+def walk(root):
+    """Yield (node, parent) pairs of a given element and its descendants,
+    including texts, in document order. Parents are given by the traversal
+    rather than Element.parent, so that subtrees shared by an Interner,
+    which have no parent, are walked as well
+    """
+    stack = [(root, None)]
+    while stack:
+        node, parent = stack.pop()
+        yield node, parent
+
+        if (not isinstance(node, str)) and node.children:
+            stack.extend((child, node) for child in reversed(node.children))
+
+
+def iter_depths(root):
+    """Yield (node, depth) pairs of a given element and its descendants
+    in document order, where the depth of the given element is 0
+    """
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+
+        if (not isinstance(node, str)) and node.children:
+            stack.extend((child, depth + 1) for child in reversed(node.children))
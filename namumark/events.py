@@ -0,0 +1,46 @@
+from collections import namedtuple
+
+Open = namedtuple('Open', ['element', 'attributes'])
+Text = namedtuple('Text', ['text'])
+Close = namedtuple('Close', ['element'])
+
+
+class Handler:
+    """Receives parsing events. Subclasses override methods
+    for the events they are interested in
+    """
+
+    def open(self, element, **attributes):
+        """A block of a given element class is opened"""
+        pass
+
+    def text(self, text):
+        """A given text is incorporated into the last opened block"""
+        pass
+
+    def close(self, element):
+        """The last opened block of a given element class is closed"""
+        pass
+
+
+class EventCollector(Handler):
+    """Collects parsing events as Open, Text and Close tuples"""
+
+    def __init__(self):
+        self.events = []
+
+    def open(self, element, **attributes):
+        self.events.append(Open(element, attributes))
+
+    def text(self, text):
+        self.events.append(Text(text))
+
+    def close(self, element):
+        self.events.append(Close(element))
+
+
+def attributes_of(block):
+    """Returns attributes of a given block which are reported in Open events"""
+    attributes = block.attributes()
+    attributes.pop('closed', None)
+    return attributes
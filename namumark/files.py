@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+
+def write_atomically(path, data):
+    """Write given bytes to a file at a given path. The bytes are written to
+    a temporary file first and then moved to the path, so that readers never
+    see a partially written file
+    """
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(descriptor, 'wb') as fp:
+            fp.write(data)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
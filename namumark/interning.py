@@ -0,0 +1,77 @@
+from .elements import Element
+
+
+class Interner:
+    """A table of closed subtrees and texts shared by documents.
+
+    Identical closed subtrees, such as thematic breaks, boilerplate headings and
+    repeated paragraphs, are replaced by a single shared instance, and identical
+    texts by a single string. Shared subtrees have no parent, so parents should
+    be found by a traversal such as walk, and they should not be modified
+    """
+
+    def __init__(self):
+        self._subtrees = {}  # (type, attributes, children) -> a shared subtree
+        self._texts = {}
+
+        self.shared = 0  # the number of subtrees replaced by shared ones
+
+    def intern(self, root):
+        """Share closed subtrees and texts of a given element with identical
+        ones interned before. Returns the given element, or a shared one
+        if the given element is closed and has been interned before
+        """
+        texts = self._texts
+        subtrees = self._subtrees
+
+        shared_of = {}  # id of an element -> its shared subtree, or None if not shareable
+
+        stack = [(root, False)]
+        while stack:
+            element, visited = stack.pop()
+            if not visited:
+                stack.append((element, True))
+                stack.extend(
+                    (child, False) for child in element.children
+                    if isinstance(child, Element)
+                )
+                continue
+
+            children = element.children
+            shareable = getattr(element, 'closed', False)
+            for index, child in enumerate(children):
+                if isinstance(child, Element):
+                    shared = shared_of.pop(id(child))
+                    if shared is None:
+                        shareable = False
+                    else:
+                        children[index] = shared
+                else:
+                    children[index] = texts.setdefault(child, child)
+
+            if not shareable:
+                shared_of[id(element)] = None
+                continue
+
+            key = (
+                type(element),
+                tuple(sorted(element.attributes().items())),
+                tuple(id(child) if isinstance(child, Element) else child for child in children),
+            )
+
+            shared = subtrees.get(key)
+            if shared is None:
+                shared = subtrees[key] = element
+                element.parent = None
+            else:
+                self.shared += 1
+            shared_of[id(element)] = shared
+
+        return shared_of[id(root)] or root
+
+    def clear(self):
+        self._subtrees.clear()
+        self._texts.clear()
+
+    def __len__(self):
+        return len(self._subtrees)
@@ -0,0 +1,96 @@
+import re
+
+from collections import OrderedDict
+
+from .specs.lexer import heading_pattern, thematic_break_pattern
+
+# A list item at the beginning of a line, which always starts a top-level block
+list_item_pattern = re.compile(r'\*|[1AaIi]\.')
+
+# Lines starting with other characters never start a run
+list_item_characters = frozenset('*1AaIi')
+boundary_characters = list_item_characters | frozenset('=-')
+
+
+def iter_runs(lines):
+    """Split given lines into runs, and yield (start, stop) of each run.
+    Every run but the first one starts with a line which closes all open blocks
+    and starts a new top-level block, so a run is parsed the same way
+    regardless of the runs before it.
+
+    Such lines are headings and thematic breaks, and lines starting with
+    a list item. Once a top-level list item starts, it contains every following
+    line until another list item starts, so only list items start new runs after it
+    """
+    start = 0
+    in_list_item = False
+
+    characters = boundary_characters
+    for number, line in enumerate(lines):
+        if line[:1] not in characters:
+            continue
+
+        if (line[0] in list_item_characters) and list_item_pattern.match(line):
+            in_list_item = True
+            characters = list_item_characters
+        elif in_list_item:
+            continue
+        elif not (heading_pattern.fullmatch(line) or thematic_break_pattern.fullmatch(line)):
+            continue
+
+        if number > start:
+            yield start, number
+            start = number
+
+    yield start, len(lines)
+
+
+class BlockMemo:
+    """A table of top-level blocks parsed from runs of lines, which is shared
+    by parses of revisions of a page. A run which is found in the table is
+    copied from it instead of being parsed again.
+
+    Least recently used runs are evicted when the table has more than
+    max_entries runs
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # lines -> (blocks, relative line starts)
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, lines):
+        """Returns blocks and their line starts relative to a given tuple of
+        lines if they are in the table, otherwise None
+        """
+        entry = self._entries.get(lines)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(lines)
+        self.hits += 1
+        return entry
+
+    def put(self, lines, blocks, starts):
+        """Keep given blocks parsed from a given tuple of lines.
+        The blocks should not be modified after this
+        """
+        # Copies of the blocks share their structural hashes, so that
+        # revisions parsed with this table are compared only by changed blocks
+        for block in blocks:
+            block.structural_hash()
+
+        self._entries[lines] = (tuple(blocks), tuple(starts))
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
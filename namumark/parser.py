@@ -1,75 +1,599 @@
+import asyncio
+import os
 import re
+import time
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
 from .elements import *
+from .events import EventCollector, attributes_of
+from .memo import iter_runs
 from .specs import *
+from .specs.lexer import Line
 
 newline_pattern = re.compile(r'\r\n|\n|\r')
+line_feed_pattern = re.compile(rb'\n')
+
+# Replaces lines[start:stop] of a source with given lines
+Edit = namedtuple('Edit', ['start', 'stop', 'lines'])
+
+
+def iterate_lines(source):
+    """Iterate lines of a given source without splitting it all at once.
+    This yields the same lines as newline_pattern.split(source)
+    """
+    position = 0
+    for match in newline_pattern.finditer(source):
+        yield source[position:match.start()]
+        position = match.end()
+
+    yield source[position:]
+
+
+def iterate_byte_lines(data, encoding='utf-8', errors='strict', chunk_size=1 << 20):
+    """Iterate lines of given bytes, or a buffer such as a memoryview or an mmap,
+    as iterate_lines does. The buffer is decoded in chunks of about a given
+    size ending with a line feed, so it is never decoded at once
+    """
+    position = 0
+    while True:
+        match = line_feed_pattern.search(data, position + chunk_size)
+        if match is None:
+            break
+
+        lines = newline_pattern.split(str(data[position:match.end()], encoding, errors))
+        lines.pop()  # An empty line after the last line terminator
+        yield from lines
+        position = match.end()
+
+    yield from iterate_lines(str(data[position:], encoding, errors))
+
+
+def iterate_file_lines(fp):
+    """Iterate lines of a given text file object. As with iterate_lines,
+    a trailing line terminator is followed by an empty line
+    """
+    line = ''
+    for line in fp:
+        yield line
+
+    if (not line) or line.endswith(('\n', '\r')):
+        yield ''
+
+
+def strip_line_terminator(line):
+    """Remove a line terminator from the end of a given line if exists"""
+    if line.endswith('\r\n'):
+        return line[:-2]
+    if line.endswith(('\n', '\r')):
+        return line[:-1]
+
+    return line
+
+
+def _heading_lines_of(document, line_starts):
+    """Returns (index of a child, line number) pairs of top-level headings
+    of a given document in an array, given the line number of each child
+    """
+    heading_lines = array('q')
+    for index, child in enumerate(document.children):
+        if isinstance(child, Heading):
+            heading_lines.extend((index, line_starts[index]))
+
+    return heading_lines
+
+
+def parse(source, **options):
+    """Parse a given source with a parser shared by every caller,
+    which is safe as a parser keeps no state of a parse.
+    Options are the ones of Parser.parse
+    """
+    return _parser.parse(source, **options)
+
+
+def _group_runs(runs, chunk_lines):
+    """Group given (start, stop) runs of lines into chunks of at least
+    a given number of lines but the last one
+    """
+    chunk_start = chunk_stop = None
+    for start, stop in runs:
+        if chunk_start is None:
+            chunk_start = start
+        chunk_stop = stop
+
+        if chunk_stop - chunk_start >= chunk_lines:
+            yield chunk_start, chunk_stop
+            chunk_start = None
+
+    if chunk_start is not None:
+        yield chunk_start, chunk_stop
 
 
 class Parser:
-    def __init__(self):
-        self._document = None
+    """Parses sources into documents. State of a parse is kept in
+    a ParseContext made for the parse, so a parser can be shared by threads
+    and used again while a parse by it is in progress
+    """
+
+    def parse(self, source, keep_lines=False, memo=None, interner=None, **limits):
+        """Parse a given source. If keep_lines is True, the document keeps its
+        source lines and where its blocks start, so that it can be updated by reparse.
+        If a BlockMemo is given, runs of lines parsed before, such as ones in
+        other revisions of the same page, are copied from it instead of being parsed.
+        If an Interner is given, closed blocks and texts of the document are shared
+        with identical ones in other documents interned by it.
+        Parsing may stop early with limits of parse_lines
+        """
+        if limits and (keep_lines or (memo is not None)):
+            raise ValueError('Limits cannot be used with keep_lines or memo')
+
+        if (not keep_lines) and (memo is None):
+            document = self.parse_lines(iterate_lines(source), **limits)
+        else:
+            lines = newline_pattern.split(source)
+
+            context = ParseContext()
+            if memo is None:
+                starts = context._incorporate_lines(lines, 0)
+            else:
+                starts = context._incorporate_runs(lines, memo)
+
+            # Sections are indexed on demand from lines of headings
+            document = context._document
+            document._section_lines = (_heading_lines_of(document, starts), len(lines))
+            if keep_lines:
+                document._lines = lines
+                document._line_starts = starts
+
+        if interner is not None:
+            interner.intern(document)
+
+        return document
+
+    def parse_section(self, source, index, number):
+        """Parse only a section of a given source starting with a heading of
+        a given number in a given HeadingIndex of the source. Blocks at the end
+        of the section are closed as the next heading would do
+        """
+        if index.length != len(source):
+            raise ValueError('A heading index should be of a given source')
+
+        start, stop = index.span(number)
+        section = strip_line_terminator(source[start:stop]) if stop < len(source) else source[start:stop]
+
+        context = ParseContext(index_sections=True)
+        document = context._parse_lines(iterate_lines(section))
+        if stop < len(source):
+            context._close_blocks(1)
+        document._truncated = (start > 0) or (stop < len(source))
+
+        return document
+
+    def parse_parallel(self, source, workers=None, executor=None, min_chunk_lines=1000):
+        """Parse a given source split into chunks in a pool of worker processes,
+        and returns the same document as parse. A given executor is used instead
+        of a new pool of a given number of workers if given, and the number of
+        workers, os.cpu_count() by default, tells how many chunks it runs at once.
+
+        Chunks are split only before lines which close every open block and
+        start a new top-level block, as BlockMemo splits runs, so blocks parsed
+        in a chunk never depend on the chunk before it. A blank line is not
+        such a line, since a paragraph continues after it.
+        Sources shorter than min_chunk_lines lines per worker are split into
+        fewer chunks, and a source which is not split is parsed here
+        """
+        lines = newline_pattern.split(source)
+
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return self.parse_parallel(source, workers, executor, min_chunk_lines)
+
+        chunk_lines = max(min_chunk_lines, -(-len(lines) // (workers or os.cpu_count() or 1)))
+        chunks = list(_group_runs(iter_runs(lines), chunk_lines))
+        if len(chunks) < 2:
+            return self.parse(source)
+
+        futures = [executor.submit(_parse_chunk, lines[start:stop]) for start, stop in chunks]
+
+        context = ParseContext()
+        starts = []
+        for (start, _), future in zip(chunks, futures):
+            data, chunk_starts = future.result()
+            context._append_blocks(Document.from_bytes(data).children)
+            starts.extend(start + number for number in chunk_starts)
+
+        document = context._document
+        document._section_lines = (_heading_lines_of(document, starts), len(lines))
+
+        return document
+
+    def reparse(self, document, edit):
+        """Apply a given edit to the source of a given document parsed with
+        keep_lines, and update the document in place. Top-level blocks are parsed
+        again from the one containing the line before the edit, until a new block
+        starts on a line where an existing block following the edit started.
+        Blocks from there are kept as they are
+        """
+        lines = getattr(document, '_lines', None)
+        if lines is None:
+            raise ValueError('A document should be parsed with keep_lines to be reparsed')
+
+        start, stop, replacement = edit
+        if not (0 <= start <= stop <= len(lines)):
+            raise ValueError('Invalid range of lines: {}-{}'.format(start, stop))
+
+        replacement = [strip_line_terminator(line) for line in replacement]
+        delta = len(replacement) - (stop - start)
+        lines[start:stop] = replacement
+
+        starts = document._line_starts
+        children = list(document.children)
+
+        # The block containing the line before the edit may continue into the edit
+        first = max(bisect_right(starts, start - 1) - 1, 0)
+        first_line = starts[first] if (first < len(starts)) and (starts[first] < start) else 0
+        following = bisect_left(starts, stop)  # the first block after the edit
+
+        context = ParseContext()
+        new_starts = []
+        resumed = len(children)
+
+        for number in range(first_line, len(lines)):
+            count = len(context._document.children)
+            context._incorporate_line(lines[number])
+            if len(context._document.children) == count:
+                continue
+
+            # A block starting on the same line as an existing one after the edit
+            # is built from the same lines as the existing one from now on
+            old_number = number - delta
+            if old_number >= stop:
+                index = bisect_left(starts, old_number, following)
+                if (index < len(starts)) and (starts[index] == old_number):
+                    context._document.children.pop()
+                    resumed = index
+                    break
+
+            new_starts.append(number)
+
+        new_children = context._document.children
+        for child in children[first:resumed]:
+            child.parent = None
+        for child in new_children:
+            child.parent = document
+
+        document.children = children[:first] + list(new_children) + children[resumed:]
+        document.invalidate_hash()
+        document._sections = None  # Built again on demand
+        document._line_starts = starts[:first] + new_starts + [
+            number + delta for number in starts[resumed:]
+        ]
+
+        return document
+
+    def parse_lines(self, lines, stop_after_sections=None, max_lines=None, until=None):
+        """Parse a given iterable of lines. Each line may end with
+        its line terminator, which will be removed.
+
+        Parsing stops before a line starting a section after a given number of
+        sections, before a given maximum number of lines, or before a line for
+        which a given predicate returns True. Then all blocks are closed and
+        the document is marked as truncated
+        """
+        return ParseContext(index_sections=True)._parse_lines(lines, stop_after_sections, max_lines, until)
+
+    async def parse_async(self, lines, yield_lines=256, yield_interval=0.005, deadline=None, encoding='utf-8'):
+        """Parse lines read from a given async iterable, such as
+        an asyncio.StreamReader, as parse_file does. Bytes are decoded
+        with a given encoding.
+
+        Control is given back to the event loop after every yield_lines lines
+        or yield_interval seconds of parsing, so other tasks keep running while
+        a large source is parsed, and a cancelled parse stops there.
+        asyncio.TimeoutError is raised when control is given back after
+        a given deadline, a time of time.monotonic. Waiting for the next line
+        is not limited by the deadline, so wrap this with asyncio.wait_for
+        to bound a slow stream as well
+        """
+        context = ParseContext(index_sections=True)
+
+        resumed = time.monotonic()
+        count = yielded = 0
+        line = ''
+        async for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode(encoding)
+
+            # Streams split lines only at line feeds
+            if '\r' in line:
+                texts = newline_pattern.split(line)
+                if not texts[-1]:
+                    texts.pop()
+            else:
+                texts = [strip_line_terminator(line)]
+
+            for text in texts:
+                context._line_number = count
+                context._incorporate_line(text)
+                count += 1
+
+            if (count >= yielded + yield_lines) or (time.monotonic() - resumed >= yield_interval):
+                if (deadline is not None) and (time.monotonic() >= deadline):
+                    raise asyncio.TimeoutError('Parsing did not finish before the deadline')
+
+                await asyncio.sleep(0)
+                resumed = time.monotonic()
+                yielded = count
+
+        # As with iterate_file_lines, a trailing line terminator is followed by an empty line
+        if (not line) or line.endswith(('\n', '\r')):
+            context._line_number = count
+            context._incorporate_line('')
+            count += 1
+
+        context._finish_sections(count)
+
+        return context._document
+
+    def parse_bytes(self, data, encoding='utf-8', errors='strict', **limits):
+        """Parse given bytes, or a buffer such as a memoryview or an mmap of
+        a file, decoding it chunk by chunk with a given encoding, which should
+        encode line terminators in ASCII as UTF-8 does.
+        Parsing may stop early with limits of parse_lines
+        """
+        return self.parse_lines(iterate_byte_lines(data, encoding, errors), **limits)
+
+    def parse_file(self, fp):
+        """Parse a given text file object line by line"""
+        return self.parse_lines(iterate_file_lines(fp))
+
+    def iter_blocks(self, source):
+        """Parse a given source and yield each top-level block as soon as
+        it is closed. Yielded blocks are detached from the document,
+        so only the blocks being built are kept in memory
+        """
+        context = ParseContext()
+
+        for line in iterate_lines(source):
+            context._incorporate_line(line)
+            yield from context._detach_closed_blocks()
+
+        # The last block is still open at the end of the source
+        yield from context._detach_blocks(len(context._document.children))
+
+    def parse_arena(self, source):
+        """Parse a given source straight into an ArenaDocument. Each top-level
+        block is moved into the arena as soon as it is closed, so Element
+        objects are kept only for the block being built
+        """
+        arena = ArenaDocument()
+        for block in self.iter_blocks(source):
+            arena.append(block)
 
-    def parse(self, source):
+        return arena
+
+    def parse_events(self, source, handler):
+        """Parse a given source and report open, text and close events
+        to a given handler instead of building a document. Closed blocks
+        are discarded right after their close events are reported
+        """
+        context = ParseContext(handler=handler)
+
+        handler.open(Document)
+        for line in iterate_lines(source):
+            context._incorporate_line(line)
+        context._close_blocks(0)
+
+    def iter_events(self, source):
+        """Parse a given source and yield Open, Text and Close events"""
+        collector = EventCollector()
+
+        context = ParseContext(handler=collector)
+
+        collector.open(Document)
+        for line in iterate_lines(source):
+            context._incorporate_line(line)
+
+            yield from collector.events
+            collector.events.clear()
+
+        context._close_blocks(0)
+        yield from collector.events
+
+
+class ParseContext:
+    """State of a single parse. Open blocks of the document being built are kept
+    in a stack, from the document to the deepest open block.
+    If index_sections is True, lines of top-level headings are recorded as they
+    are created, so that the document indexes its sections on demand.
+    If a handler is given, events are reported to it
+    """
+
+    def __init__(self, index_sections=False, handler=None):
         self._document = Document()
+        self._open_blocks = [self._document]
+        self._handler = handler
 
-        for line in newline_pattern.split(source):
-            self._incorporate_line(line)
+        self._heading_lines = array('q') if index_sections else None  # (index of a child, line number) pairs
+        self._sections = None  # a SectionIndex to count sections by, if any
+        self._line_number = 0
+
+    def _parse_lines(self, lines, stop_after_sections=None, max_lines=None, until=None):
+        """Incorporate given lines as Parser.parse_lines does, and returns the document"""
+        if (stop_after_sections is None) and (max_lines is None) and (until is None):
+            count = 0
+            for count, line in enumerate(lines, 1):
+                self._line_number = count - 1
+                self._incorporate_line(strip_line_terminator(line))
+        else:
+            count = self._incorporate_limited_lines(lines, stop_after_sections, max_lines, until)
+
+        self._finish_sections(count)
 
         return self._document
 
-    def _incorporate_line(self, line):
+    def _incorporate_lines(self, lines, first):
+        """Incorporate given lines to the current document,
+        and returns the line numbers where its children start
+        """
+        document = self._document
+
+        starts = []
+        for number, line in enumerate(lines, first):
+            self._line_number = number
+            count = len(document.children)
+            self._incorporate_line(line)
+            if len(document.children) != count:
+                starts.append(number)
+
+        return starts
+
+    def _incorporate_limited_lines(self, lines, stop_after_sections, max_lines, until):
+        """Incorporate given lines until one of given limits is reached, and
+        returns the number of incorporated lines. Only sections numbered
+        at the first depth are counted, so subsections are kept in their sections
+        """
+        sections = None
+        if stop_after_sections is not None:
+            sections = self._sections = SectionIndex()
+
+        count = 0
+        for line in lines:
+            if (max_lines is not None) and (count >= max_lines):
+                break
+
+            line = strip_line_terminator(line)
+            if (until is not None) and until(line):
+                break
+
+            self._line_number = count
+            section_count = len(sections) if sections is not None else 0
+            self._incorporate_line(line)
+
+            if (sections is not None) and (len(sections) > section_count) and (
+                    sections[-1].path[0] > stop_after_sections):
+                # Leave out the heading starting the next section
+                sections.pop()
+                self._document.children.pop()
+                del self._heading_lines[-2:]
+                break
+
+            count += 1
+        else:
+            return count
+
+        # Close blocks as the end of a source would do, so that the partial document is complete
+        self._close_blocks(1)
+        self._document._truncated = True
+
+        return count
+
+    def _incorporate_runs(self, lines, memo):
+        """Incorporate given lines run by run. Blocks of a run found in a given memo
+        are copied from it, and blocks of the other runs are put into it.
+        Returns the line numbers where children of the current document start
+        """
+        document = self._document
+
+        starts = []
+        for start, stop in iter_runs(lines):
+            run = tuple(lines[start:stop])
+
+            entry = memo.get(run)
+            if entry is None:
+                count = len(document.children)
+                run_starts = self._incorporate_lines(run, start)
+                memo.put(
+                    run,
+                    [block.copy() for block in document.children[count:]],
+                    [number - start for number in run_starts])
+                starts.extend(run_starts)
+                continue
+
+            blocks, run_starts = entry
+            self._append_blocks(block.copy() for block in blocks)
+            starts.extend(start + number for number in run_starts)
+
+        return starts
+
+    def _append_blocks(self, blocks):
+        """Append given top-level blocks parsed apart from the current document.
+        As the line starting the first block would do, all open blocks are
+        closed first, and the last blocks left open are opened again
+        """
+        document = self._document
+
+        self._close_blocks(1)
+        for block in blocks:
+            document.append(block)
+
+        current = document.last_child
+        while isinstance(current, Block) and (not current.closed):
+            self._open_blocks.append(current)
+            current = current.last_child
+
+    def _finish_sections(self, line_count):
+        """Attach recorded lines of headings to the current document, which indexes
+        its sections from them on demand, so that the index never refers to headings
+        replaced later, such as by an Interner
+        """
+        self._document._section_lines = (self._heading_lines, line_count)
+        self._sections = None
+
+    def _incorporate_line(self, text):
         """Incorporate a given line to the current document"""
+        line = Line(text)
 
         # 1. Find last open block
-        last_open_block, remaining_text = self._find_last_open_block(self._document, line)
+        last_open_block = self._find_last_open_block(line)
 
         # 2. Try to create a new block
-        tree, deepest, remaining_text = self._create_block(remaining_text)
+        tree, deepest = self._create_block(line)
 
         # 3. Incorporate the new block if it is created
         if tree:
-            self._incorporate_block(tree, last_open_block)
+            self._incorporate_block(tree)
             block_for_text = deepest
         else:
             block_for_text = last_open_block
 
         # 4. Incorporate the remaining text
+        remaining_text = line.remaining()
         if remaining_text:
             self._incorporate_text(remaining_text, block_for_text)
 
-    def _find_last_open_block(self, block, text):
-        """Find the last open block that can handle a given text.
-        If a block cannot handle the given text,
+        # 5. Report blocks which are closed on creation, such as Heading
+        if tree and self._handler:
+            self._report_closed_on_creation(tree)
+
+    def _find_last_open_block(self, line):
+        """Find the last open block that can handle a given line.
+        If a block cannot handle the given line,
         the block and its descendatns will be closed, and its parent will be returned
         """
+        open_blocks = self._open_blocks
 
-        remaining_text = text
-
-        last_open_block = None
-        for open_block in self._iterate_open_blocks(block):
-            consumed, remaining_text = spec_of(open_block).consume(remaining_text, open_block)
-            if not consumed:
-                # This open_block and its descendatns are not suitable for a given text
-                self._close_blocks(open_block)
-                last_open_block = open_block.parent  # last sutiable block
+        for index in range(len(open_blocks)):
+            open_block = open_blocks[index]
+            if not spec_of(open_block).consume(line, open_block):
+                # This open_block and its descendatns are not suitable for a given line
+                self._close_blocks(index)
                 break
 
-            last_open_block = open_block
+        return open_blocks[-1]  # last sutiable block
 
-        return last_open_block, remaining_text
-
-    def _create_block(self, text):
-        """Create a block from a given text. If the given text contains nested markers,
+    def _create_block(self, line):
+        """Create a block from a given line. If the given line contains nested markers,
         this function creates all nested blocks
         """
-        remaining_text = text
-
         tree = None
         deepest = None
         while True:
-            for spec in block_specs:
-                new_block, remaining_text = spec.create(remaining_text)
+            for spec in block_specs_for(line.leading_character()):
+                new_block = spec.create(line)
                 if not new_block:
                     continue
 
@@ -83,40 +607,137 @@ class Parser:
             else:  # No specs created a block
                 break
 
-        return tree, deepest, remaining_text
+        return tree, deepest
 
-    def _incorporate_block(self, block, target):
-        """Incorporate a given block into a given target. If the given target
-        cannot contain the given block, this function searches a new target
+    def _incorporate_block(self, block):
+        """Incorporate a given block into the last open block. If the last open
+        block cannot contain the given block, this function searches a new target
         along its ancestors
         """
-        candidate = target
-        while not spec_of(candidate).can_contain(block):
-            candidate = candidate.parent
-        self._close_blocks(candidate.last_child)
+        open_blocks = self._open_blocks
 
-        candidate.append(block)
+        index = len(open_blocks) - 1
+        while not spec_of(open_blocks[index]).can_contain(block):
+            index -= 1
+        self._close_blocks(index + 1)
+
+        open_blocks[index].append(block)
+        if (index == 0) and (self._heading_lines is not None) and isinstance(block, Heading):
+            child_index = len(self._document.children) - 1
+            self._heading_lines.extend((child_index, self._line_number))
+            if self._sections is not None:
+                self._sections.add(block, child_index, self._line_number)
+
+        current = block
+        while current and (not current.closed):
+            open_blocks.append(current)
+            current = current.last_child
+
+        if self._handler:
+            current = block
+            while current:
+                self._handler.open(type(current), **attributes_of(current))
+                current = current.first_child
 
     def _incorporate_text(self, text, target):
         """Incorporate a given text into a given target. If the given target
         cannot accept text, the given text will be wrapped in Paragraph
         """
-        if not spec_of(target).accepts_text:
-            text = Paragraph(text)
+        if self._handler:
+            # Texts are only reported, not kept in the tree
+            if not spec_of(target).accepts_text:
+                self._append_paragraph(Paragraph(), target)
+                self._handler.open(Paragraph)
+            self._handler.text(text)
+            return
 
-        target.append(text)
+        if spec_of(target).accepts_text:
+            target.append(text)
+        else:
+            self._append_paragraph(Paragraph(text), target)
 
-    def _iterate_open_blocks(self, block):
-        """Iterate open blocks from a given block.
-        Note: Only last children can be open blocks
+    def _append_paragraph(self, paragraph, target):
+        """Append a given paragraph to a given target. The paragraph is pushed
+        to the open block stack only if the target is the last open block
         """
-        current = block
-        while current and isinstance(current, Block) and (not current.closed):
-            yield current
+        target.append(paragraph)
 
-            current = current.last_child
+        if target is self._open_blocks[-1]:
+            self._open_blocks.append(paragraph)
+
+    def _detach_closed_blocks(self):
+        """Detach closed top-level blocks from the current document.
+        Note: Only the last child of the document can be open
+        """
+        children = self._document.children
+        if not children:
+            return []
 
-    def _close_blocks(self, block):
-        """Close a given block and its descendatns"""
-        for open_block in self._iterate_open_blocks(block):
+        count = len(children) if children[-1].closed else len(children) - 1
+        return self._detach_blocks(count)
+
+    def _detach_blocks(self, count):
+        """Detach first top-level blocks of a given count from the current document"""
+        children = self._document.children
+        if not count:
+            return []
+
+        blocks = children[:count]
+        del children[:count]
+
+        for block in blocks:
+            block.parent = None
+
+        return blocks
+
+    def _close_blocks(self, index):
+        """Close open blocks from a given index of the open block stack"""
+        open_blocks = self._open_blocks
+
+        if self._handler:
+            self._report_closing(open_blocks[index:])
+
+        for open_block in open_blocks[index:]:
             open_block.closed = True
+        del open_blocks[index:]
+
+    def _report_closed_on_creation(self, tree):
+        """Report a block closed on creation in a given tree
+        and its descendants as closed
+        """
+        current = tree
+        while current and not current.closed:
+            current = current.last_child
+
+        if current:
+            blocks = [current]
+            while blocks[-1].last_child:
+                blocks.append(blocks[-1].last_child)
+            self._report_closing(blocks)
+
+    def _report_closing(self, blocks):
+        """Report given blocks as closed from the deepest one,
+        then discard them from the tree
+        """
+        if not blocks:
+            return
+
+        for block in reversed(blocks):
+            self._handler.close(type(block))
+
+        parent = blocks[0].parent
+        if parent:
+            parent.children.pop()
+
+
+_parser = Parser()
+
+
+def _parse_chunk(lines):
+    """Parse given lines in a worker process of Parser.parse_parallel,
+    and returns the encoded document and where its children start
+    """
+    context = ParseContext()
+    starts = context._incorporate_lines(lines, 0)
+
+    return context._document.to_bytes(), starts
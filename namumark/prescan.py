@@ -0,0 +1,144 @@
+import re
+import struct
+import sys
+
+from array import array
+
+from .specs.lexer import heading_pattern
+
+# Lines are split as newline_pattern of the parser does, so a line starts
+# at the beginning of a source or after any line terminator.
+# Patterns starting with a newline are searched much faster, so they are used
+# unless a source has line terminators of a single carriage return
+heading_line_pattern = re.compile(r'(?<![^\r\n])=[^\r\n]*')
+heading_line_after_newline_pattern = re.compile(r'\n(=[^\r\n]*)')
+list_item_line_pattern = re.compile(r'(?<![^\r\n])(?:\*|[1AaIi]\.)')
+list_item_line_after_newline_pattern = re.compile(r'\n(\*|[1AaIi]\.)')
+
+MAGIC = b'NMKH'
+VERSION = 1
+header = struct.Struct('<4sBQI')  # magic, version, source length, the number of headings
+
+
+class HeadingIndex:
+    """Offsets of top-level headings of a source, found by scanning lines
+    without parsing them. Offsets are indices of characters in the source.
+
+    A heading at the beginning of a line is a top-level heading, unless
+    a list item at the beginning of a line comes before it, as a top-level
+    list item contains every line after it but list items
+    """
+
+    def __init__(self, length=0):
+        self.length = length  # of the source, to check if the index is of it
+        self.offsets = array('q')
+        self.lines = array('q')
+        self.levels = array('B')
+
+    @classmethod
+    def scan(cls, source):
+        """Scan a given source for top-level headings"""
+        index = cls(len(source))
+
+        # Lines after the first list item are in top-level list items
+        list_items = iter_lines(source, list_item_line_pattern, list_item_line_after_newline_pattern)
+        end = next(list_items, (len(source), None))[0]
+
+        line = 0
+        position = 0
+        for start, text in iter_lines(source, heading_line_pattern, heading_line_after_newline_pattern, end):
+            title = heading_pattern.fullmatch(text)
+            if not title:
+                continue
+
+            line += (
+                source.count('\n', position, start) + source.count('\r', position, start)
+                - source.count('\r\n', position, start)
+            )
+            position = start
+
+            index.offsets.append(start)
+            index.lines.append(line)
+            index.levels.append(len(title.group(1)))
+
+        return index
+
+    def span(self, number):
+        """Returns (start, stop) offsets of a section starting with a heading
+        of a given number. The section ends before the next heading of
+        the same or a higher level
+        """
+        level = self.levels[number]
+        for following in range(number + 1, len(self.offsets)):
+            if self.levels[following] <= level:
+                return self.offsets[number], self.offsets[following]
+
+        return self.offsets[number], self.length
+
+    def to_bytes(self):
+        """Encode this index to be cached next to its source"""
+        chunks = [header.pack(MAGIC, VERSION, self.length, len(self.offsets))]
+        for values in [self.offsets, self.lines, self.levels]:
+            chunks.append(_little_endian(values).tobytes())
+
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode an index encoded by to_bytes"""
+        if len(data) < header.size:
+            raise ValueError('Truncated data')
+
+        magic, version, length, count = header.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not an encoded heading index')
+        if version != VERSION:
+            raise ValueError('Unsupported version: {}'.format(version))
+
+        index = cls(length)
+
+        position = header.size
+        for values in [index.offsets, index.lines, index.levels]:
+            size = count * values.itemsize
+            if position + size > len(data):
+                raise ValueError('Truncated data')
+
+            values.frombytes(data[position:position + size])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            position += size
+
+        return index
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+def iter_lines(source, pattern, after_newline_pattern, end=None):
+    """Yield (offset, text) of lines matching a given pattern at their beginnings
+    in source[:end]. The other pattern should match the same lines after
+    a newline with a group of the same text
+    """
+    if end is None:
+        end = len(source)
+
+    if source.count('\r') != source.count('\r\n'):
+        for match in pattern.finditer(source, 0, end):
+            yield match.start(), match.group()
+        return
+
+    match = pattern.match(source, 0, end)
+    if match:
+        yield 0, match.group()
+
+    for match in after_newline_pattern.finditer(source, 0, end):
+        yield match.start(1), match.group(1)
+
+
+def _little_endian(values):
+    if sys.byteorder == 'little':
+        return values
+
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
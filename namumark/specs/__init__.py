@@ -1,4 +1,13 @@
+import hashlib
+
+from types import MappingProxyType
+
 from ..elements import Block
+from ..elements.serialization import classes_by_name
+
+# Bump when parsing gives different documents while registered specifications
+# and fields of elements stay the same, such as by a change of the lexer
+PARSER_VERSION = 1
 
 _spec_by_element = {}
 _block_specs = []
@@ -6,6 +15,9 @@ _block_specs = []
 
 def spec_for(element_cls):
     def decorator(spec_cls):
+        # Parsers share the registry without locks, so it never changes after import
+        if isinstance(_spec_by_element, MappingProxyType):
+            raise RuntimeError('Specifications cannot be added after namumark.specs is imported')
         if element_cls in _spec_by_element:
             raise ValueError('An element can only have one specification')
 
@@ -23,7 +35,57 @@ def spec_of(element):
     return _spec_by_element.get(type(element), None)
 
 
+def registry_version():
+    """Returns a string identifying the version of parsing, which changes when
+    PARSER_VERSION is bumped, a specification is added, removed or moved, or
+    fields of an element change
+    """
+    specs = '\n'.join(
+        '{}.{}:{}'.format(spec.__module__, spec.__qualname__, element_cls.__name__)
+        for element_cls, spec in _spec_by_element.items()
+    )
+    fields = '\n'.join(
+        '{}({})'.format(name, ','.join(cls._fields))
+        for name, cls in sorted(classes_by_name().items())
+    )
+    version = '{}\n{}\n{}'.format(PARSER_VERSION, specs, fields)
+
+    return hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+
+
+def block_specs_for(text):
+    """Returns block specifications which can create a block from a given text"""
+    return _block_specs_by_character.get(text[:1], _block_specs_for_any)
+
+
 # Specs should be imported after spec_for
 from .specs import *  # noqa: E402
 
 block_specs = tuple(_block_specs)
+_spec_by_element = MappingProxyType(_spec_by_element)
+
+
+def _build_dispatch_table(specs):
+    """Index given specifications by leading characters
+    while keeping their order
+    """
+    characters = set()
+    for spec in specs:
+        characters.update(spec.leading_characters or '')
+
+    specs_for_any = tuple(
+        spec for spec in specs
+        if spec.leading_characters is None
+    )
+    specs_by_character = {
+        character: tuple(
+            spec for spec in specs
+            if (spec.leading_characters is None) or (character in spec.leading_characters)
+        )
+        for character in characters
+    }
+
+    return specs_by_character, specs_for_any
+
+
+_block_specs_by_character, _block_specs_for_any = _build_dispatch_table(block_specs)
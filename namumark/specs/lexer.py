@@ -0,0 +1,211 @@
+import re
+
+from collections import namedtuple
+
+# Kinds of tokens. Each kind is a single character,
+# so that a sequence of tokens is represented as a string
+QUOTE = '>'  # >
+SPACE = ' '  # a whitespace
+BULLET = '*'  # *
+ORDERED = '.'  # 1. A. a. I. i.
+START = '#'  # #42 right after an ordered list marker
+HEADING = '='  # = heading =
+THEMATIC_BREAK = '-'  # ----
+
+# lengths and values are None when every token is a single character
+# which is its own value
+Tokens = namedtuple('Tokens', ['kinds', 'lengths', 'values'])
+Title = namedtuple('Title', ['level', 'start', 'end'])
+
+marker_pattern = re.compile(r'''
+    (?P<quote>\>)
+    |
+    (?P<space>[ ])
+    |
+    (?P<bullet>\*)
+    |
+    (?P<ordered>[1AaIi])\.
+    |
+    \#(?P<start>\d+)
+''', re.VERBOSE)
+
+marker_characters = frozenset('> *1AaIi')
+
+kind_by_group = {
+    'quote': QUOTE,
+    'space': SPACE,
+    'bullet': BULLET,
+    'ordered': ORDERED,
+    'start': START,
+}
+
+prefix_pattern = re.compile(r'''
+    (?:
+        \>
+        |
+        [ ]
+        |
+        \*
+        |
+        [1AaIi]\.
+        (?:\#\d+)?  # start markers only follow ordered list markers
+    )*
+''', re.VERBOSE)
+
+# Patterns below are matched against a whole text with fullmatch
+heading_pattern = re.compile(r'''
+    (\={1,6})  # marker
+    [ ]+  # required whitespace
+    (.*)  # text
+    [ ]+  # required whitespace
+    \1
+''', re.VERBOSE)
+
+thematic_break_pattern = re.compile(r'''
+    \-{4,9}  # marker
+''', re.VERBOSE)
+
+
+def tokenize(text, start=0, end=None):
+    """Split markers at the beginning of a given text into tokens.
+    A heading or a thematic break following the markers becomes the last token.
+    If start and end are given, only text[start:end] is tokenized without copying it
+    """
+    if end is None:
+        end = len(text)
+
+    leading_character = text[start:start + 1] if start < end else ''
+    if leading_character not in marker_characters:  # Most lines have no markers
+        return tokenize_rest(text, start, end, '', [], [])
+
+    position = prefix_pattern.match(text, start, end).end()
+    prefix = text[start:position]
+
+    if ('.' not in prefix) and ('#' not in prefix):
+        # Every marker is a single character, which is its own value
+        if text[position:position + 1] not in ('=', '-'):
+            return Tokens(prefix, None, None)
+
+        return tokenize_rest(text, position, end, prefix, [1] * len(prefix), list(prefix))
+
+    kinds = []
+    lengths = []
+    values = []
+    for match in marker_pattern.finditer(text, start, position):
+        kind = match.lastgroup
+        value = match.group(kind)
+        kinds.append(kind_by_group[kind])
+        lengths.append(match.end() - match.start())
+        values.append(int(value) if kind == 'start' else value)
+
+    return tokenize_rest(text, position, end, ''.join(kinds), lengths, values)
+
+
+def tokenize_rest(text, position, end, kinds, lengths, values):
+    """Append a heading or a thematic break token to given tokens
+    if text[position:end] is one of them
+    """
+    leading_character = text[position:position + 1] if position < end else ''
+    if leading_character == '=':
+        match = heading_pattern.fullmatch(text, position, end)
+        if match:
+            kinds += HEADING
+            lengths.append(end - position)
+            values.append(Title(len(match.group(1)), match.start(2), match.end(2)))
+    elif leading_character == '-':
+        if thematic_break_pattern.fullmatch(text, position, end):
+            kinds += THEMATIC_BREAK
+            lengths.append(end - position)
+            values.append(None)
+
+    return Tokens(kinds, lengths, values)
+
+
+class Line:
+    """A cursor over the remaining part of a line, text[start:end].
+    Specifications consume markers by moving the offsets, and the remaining
+    text is sliced only when it is finally incorporated. Markers are
+    tokenized only once when a specification reads them first
+    """
+
+    __slots__ = ('text', 'start', 'end', 'index', '_kinds', '_lengths', '_values')
+
+    def __init__(self, text, start=0, end=None):
+        self.text = text
+        self.narrow(start, len(text) if end is None else end)
+
+    def narrow(self, start, end):
+        """Limit the remaining part to text[start:end]"""
+        self.start = start
+        self.end = end
+        self.index = 0
+        self._kinds = None
+
+    def remaining(self):
+        """Returns the remaining text"""
+        return self.text[self.start:self.end]
+
+    def leading_character(self):
+        """Returns the first character of the remaining text if exists"""
+        if self.start < self.end:
+            return self.text[self.start]
+
+        return ''
+
+    def _tokenize(self):
+        self._kinds, self._lengths, self._values = tokenize(self.text, self.start, self.end)
+        return self._kinds
+
+    def kind(self, offset=0):
+        """Returns the kind of the next token after a given offset,
+        or an empty string if there are no more tokens
+        """
+        kinds = self._kinds
+        if kinds is None:
+            kinds = self._tokenize()
+
+        index = self.index + offset
+        return kinds[index:index + 1]
+
+    def value(self, offset=0):
+        """Returns the value of the next token after a given offset"""
+        index = self.index + offset
+        if self._values is None:
+            return self._kinds[index]
+
+        return self._values[index]
+
+    def count(self, kind, offset=0):
+        """Returns the number of consecutive tokens of a given kind after a given offset"""
+        kinds = self._kinds
+
+        start = self.index + offset
+        end = start
+        while kinds[end:end + 1] == kind:
+            end += 1
+
+        return end - start
+
+    def advance(self, count=1):
+        """Consume the next tokens of a given count"""
+        lengths = self._lengths
+
+        if lengths is None:
+            self.start += count
+        elif count == 1:
+            self.start += lengths[self.index]
+        else:
+            self.start += sum(lengths[self.index:self.index + count])
+
+        self.index += count
+
+    def merge(self, offset=0):
+        """Merge the next token after a given offset into its preceding token,
+        so that both are consumed together as the preceding one
+        """
+        index = self.index + offset
+
+        self._lengths[index - 1] += self._lengths[index]
+        self._kinds = self._kinds[:index] + self._kinds[index + 1:]
+        del self._lengths[index]
+        del self._values[index]
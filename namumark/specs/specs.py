@@ -1,8 +1,7 @@
-import re
-
 from collections import namedtuple
 
 from . import spec_for
+from .lexer import *
 from ..elements import *
 
 
@@ -10,25 +9,31 @@ from ..elements import *
 class BlockSpec:
     accepts_text = False
 
-    @classmethod
-    def create(cls, text):
-        """Try to create an element from a given text. Normally, this function
-        looks only markers and uses only those markers from the given text.
+    # Characters that a text can start with when create succeeds.
+    # None means that create should be tried for any text
+    leading_characters = ''
 
-        If success, returns (Created element, remaining text)
-        Otherwise, returns (None, the given text)
+    @classmethod
+    def create(cls, line):
+        """Try to create an element from a given line. Normally, this function
+        looks only markers and uses only those markers from the given line.
+        The line is a cursor over (text, offset), so markers are consumed
+        by moving its offset without copying the text.
+
+        If success, advances the given line and returns the created element
+        Otherwise, returns None
         """
-        return (None, text)
+        return None
 
     @classmethod
-    def consume(cls, text, context):
-        """Try to consume markers from a given text. This function checks
-        whether the given text is sutiable for this element or not.
+    def consume(cls, line, context):
+        """Try to consume markers from a given line. This function checks
+        whether the given line is sutiable for this element or not.
 
-        If success, returns (True, remaining text)
-        Otherwise, returns (False, the given text)
+        If success, advances the given line and returns True
+        Otherwise, returns False
         """
-        return (False, text)
+        return False
 
     @staticmethod
     def can_contain(element):
@@ -41,10 +46,11 @@ class BlockSpec:
 @spec_for(Document)
 class DocumentSpec(BlockSpec):
     accepts_text = False
+    leading_characters = ''
 
     @classmethod
-    def consume(cls, text, context):
-        return (True, text)
+    def consume(cls, line, context):
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -61,26 +67,19 @@ class HeadingSpec(BlockSpec):
     ===== heading 5 =====
     ====== heading 6 ======
     '''
-    syntax = re.compile(r'''
-        ^
-            (\={1,6})  # marker
-            [ ]+  # required whitespace
-            (.*)  # text
-            [ ]+  # required whitespace
-            \1
-        $
-    ''', re.VERBOSE)
+    syntax = heading_pattern
 
     accepts_text = True
+    leading_characters = '='
 
     @classmethod
-    def create(cls, text):
-        match = cls.syntax.search(text)
-        if not match:
-            return (None, text)
+    def create(cls, line):
+        if line.kind() != HEADING:
+            return None
 
-        level = len(match.group(1))
-        return (Heading(level=level), match.group(2))
+        title = line.value()
+        line.narrow(title.start, title.end)
+        return Heading(level=title.level)
 
     @staticmethod
     def can_contain(element):
@@ -93,31 +92,25 @@ class QuoteSpec(BlockSpec):
     > text 1
     > text 2
     '''
-    syntax = re.compile(r'''
-        ^
-            \>  # marker
-            [ ]*  # optional whitespace
-            (.*)  # text
-        $
-    ''', re.VERBOSE)
-
     accepts_text = False
+    leading_characters = '>'
 
     @classmethod
-    def create(cls, text):
-        consumed, remaining_text = cls.consume(text, None)
-        if not consumed:
-            return (None, text)
+    def create(cls, line):
+        if not cls.consume(line, None):
+            return None
 
-        return (Quote(), remaining_text)
+        return Quote()
 
     @classmethod
-    def consume(cls, text, context):
-        match = cls.syntax.search(text)
-        if not match:
-            return (False, text)
+    def consume(cls, line, context):
+        # '>  text' -> 'text'
+        if line.kind() != QUOTE:
+            return False
 
-        return (True, match.group(1))
+        line.advance(1 + line.count(SPACE, 1))  # optional whitespace
+
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -130,56 +123,27 @@ class UnorderedListSpec(BlockSpec):
      * text 1
      * text 2
     '''
-    syntax_for_create = re.compile(r'''
-        ^
-            [ ]  # required whitespace
-            (
-                \*  # marker
-                [ ]?  # optional whitespace
-                .*  # text
-            )
-        $
-    ''', re.VERBOSE)
-
-    syntax_for_consume = re.compile(r'''
-        ^
-            [ ]  # required whitespace
-            (
-                (?:  # a new unordered list item
-                    \*  # marker
-                    [ ]?  # optional whitespace
-                    .*  # text
-                )
-                |
-                (?:  # line continuations
-                    (?!\*)  # no unordered list marker
-                    (?![1AaIi]\.)  # no ordered list marker
-                    .*  # text
-                )
-            )
-        $
-    ''', re.VERBOSE)
-
     accepts_text = False
+    leading_characters = ' '
 
     @classmethod
-    def create(cls, text):
+    def create(cls, line):
         # ' * text 1' -> '* text 1'
-        match = cls.syntax_for_create.search(text)
-        if not match:
-            return (None, text)
+        if (line.kind() != SPACE) or (line.kind(1) != BULLET):
+            return None
 
-        return (UnorderedList(), match.group(1))
+        line.advance()
+        return UnorderedList()
 
     @classmethod
-    def consume(cls, text, context):
-        # ' * text 1' -> '* text 1'
-        # ' text 1' -> 'text 1'
-        match = cls.syntax_for_consume.search(text)
-        if not match:
-            return (False, text)
+    def consume(cls, line, context):
+        # ' * text 1' -> '* text 1' (a new unordered list item)
+        # ' text 1' -> 'text 1' (line continuations)
+        if (line.kind() != SPACE) or (line.kind(1) == ORDERED):
+            return False
 
-        return (True, match.group(1))
+        line.advance()
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -198,73 +162,45 @@ class OrderedListSpec(BlockSpec):
      I.#42 text 6
      I. text 7
     '''
-    syntax_for_create = re.compile(r'''
-        ^
-            [ ]  # required whitespace
-            (?P<marker>
-                (?P<bullet>[1AaIi])  # marker, bullet
-                \.  # marker
-            )
-            (?:
-                \#  # marker
-                (?P<start>\d+)  # marker, start
-            )?
-            (?P<text>
-                [ ]?  # optional whitespace
-                .*  # text
-            )
-        $
-    ''', re.VERBOSE)
-
-    syntax_for_consume = re.compile(r'''
-        ^
-            [ ]  # required whitespace
-            (
-                (?:  # a new unordered list item
-                    (?P<bullet>[1AaIi])  # marker, bullet
-                    \.  # marker
-                    (?!\#\d+)  # no start marker
-                    [ ]?  # optional whitespace
-                    .*  # text
-                )
-                |
-                (?:  # line continuations
-                    (?!\*)  # no unordered list marker
-                    (?![1AaIi]\.)  # no ordered list marker
-                    .*  # text
-                )
-            )
-        $
-    ''', re.VERBOSE)
-
     accepts_text = False
+    leading_characters = ' '
 
     @classmethod
-    def create(cls, text):
+    def create(cls, line):
         # ' 1. text 1' -> '1. text 1'
         # ' 1.#42 text 1' -> '1. text 1'
-        match = cls.syntax_for_create.search(text)
-        if not match:
-            return (None, text)
+        if (line.kind() != SPACE) or (line.kind(1) != ORDERED):
+            return None
 
-        return (
-            OrderedList(bullet=match.group('bullet'),
-                        start=int(match.group('start') or 1)),
-            match.group('marker') + match.group('text'))
+        bullet = line.value(1)
+        start = 1
+        if line.kind(2) == START:
+            start = line.value(2)
+            line.merge(2)  # the start marker is consumed with the bullet
+
+        line.advance()
+        return OrderedList(bullet=bullet, start=start)
 
     @classmethod
-    def consume(cls, text, context):
-        # ' text 1' -> 'text 1'
-        # ' 1. text 1' -> '1. text 1'
-        match = cls.syntax_for_consume.search(text)
-        if not match:
-            return (False, text)
+    def consume(cls, line, context):
+        # ' text 1' -> 'text 1' (line continuations)
+        # ' 1. text 1' -> '1. text 1' (a new ordered list item)
+        if line.kind() != SPACE:
+            return False
+
+        kind = line.kind(1)
+        if kind == BULLET:
+            return False
 
-        bullet = match.group('bullet')
-        if bullet and (bullet != context.bullet):
-            return (False, text)
+        if kind == ORDERED:
+            if line.kind(2) == START:  # a new ordered list
+                return False
 
-        return (True, match.group(1))
+            if line.value(1) != context.bullet:
+                return False
+
+        line.advance()
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -287,37 +223,29 @@ class ListItemSpec(BlockSpec):
     1. text 1
     text 2
     '''
-    syntax = re.compile(r'''
-        ^
-            (?:
-                \*  # unordered list marker
-                |
-                [1AaIi]\.  # ordered list marker
-            )
-            [ ]?  # optional whitespace
-            (.*)  # text
-        $
-    ''', re.VERBOSE)
-
     accepts_text = False
+    leading_characters = '*1AaIi'
 
     @classmethod
-    def create(cls, text):
-        match = cls.syntax.search(text)
-        if not match:
-            return (False, text)
+    def create(cls, line):
+        if line.kind() not in (BULLET, ORDERED):
+            return None
 
-        return (ListItem(), match.group(1))
+        if line.kind(1) == SPACE:  # optional whitespace
+            line.advance(2)
+        else:
+            line.advance()
+
+        return ListItem()
 
     @classmethod
-    def consume(cls, text, context):
-        match = cls.syntax.search(text)
-        if match:
+    def consume(cls, line, context):
+        if line.kind() in (BULLET, ORDERED):
             # Case 1: a new list item
-            return (False, text)
+            return False
 
         # Case 2: line continuations
-        return (True, text)
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -327,10 +255,11 @@ class ListItemSpec(BlockSpec):
 @spec_for(Paragraph)
 class ParagraphSpec(BlockSpec):
     accepts_text = True
+    leading_characters = ''
 
     @classmethod
-    def consume(cls, text, context):
-        return (True, text)
+    def consume(cls, line, context):
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -343,30 +272,23 @@ class IndentationSpec(BlockSpec):
      text 1
      text 2
     '''
-    syntax = re.compile(r'''
-        ^
-            [ ]  # marker
-            (.*)  # text
-        $
-    ''', re.VERBOSE)
-
     accepts_text = False
+    leading_characters = ' '
 
     @classmethod
-    def create(cls, text):
-        consumed, remaining_text = cls.consume(text, None)
-        if not consumed:
-            return (None, text)
+    def create(cls, line):
+        if not cls.consume(line, None):
+            return None
 
-        return (Indentation(), remaining_text)
+        return Indentation()
 
     @classmethod
-    def consume(cls, text, context):
-        match = cls.syntax.search(text)
-        if not match:
-            return (False, text)
+    def consume(cls, line, context):
+        if line.kind() != SPACE:
+            return False
 
-        return (True, match.group(1))
+        line.advance()
+        return True
 
     @staticmethod
     def can_contain(element):
@@ -383,21 +305,18 @@ class ThematicBreakSpec(BlockSpec):
     --------
     ---------
     '''
-    syntax = re.compile(r'''
-        ^
-            \-{4,9}  # marker
-        $
-    ''', re.VERBOSE)
+    syntax = thematic_break_pattern
 
     accepts_text = False
+    leading_characters = '-'
 
     @classmethod
-    def create(cls, text):
-        match = cls.syntax.search(text)
-        if not match:
-            return (None, text)
+    def create(cls, line):
+        if line.kind() != THEMATIC_BREAK:
+            return None
 
-        return (ThematicBreak(), '')
+        line.narrow(line.end, line.end)
+        return ThematicBreak()
 
     @staticmethod
     def can_contain(element):
@@ -0,0 +1,31 @@
+from namumark import Parser, parse_many
+from namumark.elements import ArenaDocument
+
+
+sources = [
+    '= heading {} =\n> quote\n * item {}\nparagraph'.format(index, index)
+    for index in range(20)
+]
+
+
+def test_parse_many():
+    expected = [Parser().parse(source) for source in sources]
+
+    assert list(parse_many(sources, workers=2, chunksize=3)) == expected
+    assert list(parse_many(iter(sources), workers=2, chunksize=1, max_pending=1)) == expected
+
+    completed = list(parse_many(sources, workers=2, chunksize=3, ordered=False))
+    assert sorted(index for index, _ in completed) == list(range(len(sources)))
+    for index, document in completed:
+        assert document == expected[index]
+
+    arenas = list(parse_many(sources, workers=2, arena=True))
+    assert all(isinstance(arena, ArenaDocument) for arena in arenas)
+    assert [arena.to_document() for arena in arenas] == expected
+
+
+def test_parse_many_with_large_start():
+    sources = [' 1.#99999999999999999999 item', ' 1.#3 item']
+    expected = [Parser().parse(source) for source in sources]
+
+    assert list(parse_many(sources, workers=1)) == expected
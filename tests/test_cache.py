@@ -0,0 +1,71 @@
+from namumark import CachingParser, Parser, specs
+
+
+def test_caching_parser():
+    parser = CachingParser(max_entries=2)
+    sources = ['= heading {} =\nparagraph'.format(index) for index in range(3)]
+
+    first = parser.parse(sources[0])
+    assert first == Parser().parse(sources[0])
+    second = parser.parse(sources[0])
+    assert (second == first) and (second is not first)
+    assert (parser.hits, parser.misses, parser.evictions) == (1, 1, 0)
+
+    parser.parse(sources[1])
+    parser.parse(sources[2])
+    assert (parser.hits, parser.misses, parser.evictions) == (1, 3, 1)
+
+    parser.parse(sources[0])
+    assert (parser.hits, parser.misses, parser.evictions) == (1, 4, 2)
+
+    parser = CachingParser(max_bytes=0)
+    parser.parse(sources[0])
+    parser.parse(sources[0])
+    assert (parser.hits, parser.misses, parser.size) == (0, 2, 0)
+
+
+def test_caching_parser_directory(tmp_path):
+    source = '> quote\n * item'
+
+    parser = CachingParser(directory=str(tmp_path))
+    expected = parser.parse(source)
+
+    parser = CachingParser(directory=str(tmp_path))
+    assert parser.parse(source) == expected
+    assert parser.parse(source) == expected
+    assert (parser.hits, parser.disk_hits, parser.misses) == (1, 1, 0)
+
+    # Corrupted entries are parsed again
+    for path in tmp_path.glob('*/*'):
+        path.write_bytes(b'corrupted')
+    parser = CachingParser(directory=str(tmp_path))
+    assert parser.parse(source) == expected
+    assert (parser.disk_hits, parser.misses) == (0, 1)
+
+    # Including ones whose kind tables are corrupted
+    source = ' 1.#3 item'
+    expected = CachingParser(directory=str(tmp_path)).parse(source)
+    for path in tmp_path.glob('*/*'):
+        path.write_bytes(path.read_bytes().replace(b'start', b'xtart'))
+    parser = CachingParser(directory=str(tmp_path))
+    assert parser.parse(source) == expected
+    assert (parser.disk_hits, parser.misses) == (0, 1)
+
+
+def test_caching_parser_surrogates(tmp_path):
+    # A lone surrogate such as one decoded from a JSON escape
+    source = '= \ud800 =\nparagraph \udfff'
+    expected = Parser().parse(source)
+
+    parser = CachingParser(directory=str(tmp_path))
+    assert parser.parse(source) == expected
+    assert parser.parse(source) == expected
+    assert CachingParser(directory=str(tmp_path)).parse(source) == expected
+
+
+def test_caching_parser_version(monkeypatch):
+    key = CachingParser().key_of('paragraph')
+
+    # Entries parsed by an older version of the parser are never used
+    monkeypatch.setattr(specs, 'PARSER_VERSION', specs.PARSER_VERSION + 1)
+    assert CachingParser().key_of('paragraph') != key
@@ -0,0 +1,27 @@
+from namumark import BlockMemo, Parser, diff
+from namumark.diff import CHANGE, INSERT, REMOVE
+
+
+def test_diff():
+    old = Parser().parse('= a =\nparagraph\n> quote\n----\n= b =\ntext')
+    new = Parser().parse('= a =\nparagraph 2\n> quote\n= c =\n----\n= b =')
+
+    changes = diff(old, new)
+    assert [(change.operation, change.old_index, change.new_index) for change in changes] == [
+        (CHANGE, 1, 1),
+        (INSERT, 3, 3),
+        (REMOVE, 5, 6),
+    ]
+    assert changes[0].old is old.children[1]
+    assert changes[0].new is new.children[1]
+    assert diff(old, old) == []
+
+
+def test_diff_with_memo():
+    memo = BlockMemo()
+    old = Parser().parse('= a =\nparagraph\n= b =\ntext', memo=memo)
+    new = Parser().parse('= a =\nparagraph\n= b =\ntext 2', memo=memo)
+
+    # Hashes of blocks copied from the memo are already known
+    assert new.children[0]._hash is not None
+    assert [change.operation for change in diff(old, new)] == [CHANGE]
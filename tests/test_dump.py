@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+
+from namumark import Parser
+from namumark.dump import BinarySink, JSONLinesSink, Sink, ingest, iter_binary, iter_records
+
+
+records = [
+    {'namespace': 0, 'title': '문서 {}'.format(index), 'text': '= 제목 =\n> "인용" {}\n * item'.format(index)}
+    for index in range(30)
+]
+
+
+def test_iter_records():
+    data = json.dumps(records, ensure_ascii=False, indent=1).encode('utf-8')
+
+    decoded = list(iter_records(io.BytesIO(data), chunk_size=7))
+    assert [record for _, record in decoded] == records
+
+    # Decoding resumes right after a record
+    offset, _ = decoded[9]
+    assert [record for _, record in iter_records(io.BytesIO(data), offset)] == records[10:]
+
+    assert list(iter_records(io.BytesIO(b' [ ] '))) == []
+
+
+def test_ingest(tmp_path):
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+    checkpoint = tmp_path / 'checkpoint.json'
+
+    with BinarySink(tmp_path / 'documents.bin') as sink:
+        stats = ingest(path, sink, checkpoint=checkpoint, checkpoint_every=10, workers=2, chunksize=4)
+    assert stats.records == len(records)
+
+    with open(tmp_path / 'documents.bin', 'rb') as fp:
+        written = list(iter_binary(fp))
+    assert [record['title'] for record, _ in written] == [record['title'] for record in records]
+    assert [document for _, document in written] == [Parser().parse(record['text']) for record in records]
+
+    # Resuming after the whole dump writes nothing more
+    with BinarySink(tmp_path / 'documents.bin') as sink:
+        assert ingest(path, sink, checkpoint=checkpoint, workers=2).records == 0
+    with open(tmp_path / 'documents.bin', 'rb') as fp:
+        assert len(list(iter_binary(fp))) == len(records)
+
+    with JSONLinesSink(tmp_path / 'documents.jsonl') as sink:
+        ingest(path, sink, workers=1)
+    lines = (tmp_path / 'documents.jsonl').read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[0])['document']['children'][0] == {
+        'type': 'Heading', 'closed': True, 'level': 1, 'children': ['제목'],
+    }
+
+
+def test_iter_records_with_malformed_record():
+    data = json.dumps(records, ensure_ascii=False).encode('utf-8')
+    malformed = data.replace(b'"namespace"', b'"namespace" 1', 2)  # in the second record
+    fp = io.BytesIO(malformed)
+
+    # Offsets are of bytes rather than characters
+    with pytest.raises(ValueError, match='byte {}:'.format(malformed.index(b' 1', 10) + 1)):
+        list(iter_records(fp, chunk_size=64))
+    assert fp.tell() < len(malformed) // 4  # Raised without reading the rest
+
+
+def test_incomplete_sink(tmp_path):
+    class IncompleteSink(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink(tmp_path / 'documents')
+    assert not (tmp_path / 'documents').exists()
+
+
+def test_ingest_with_surrogates(tmp_path):
+    # JSON escapes of lone surrogates are valid, and decoded as they are
+    path = tmp_path / 'dump.json'
+    path.write_text('[{"title": "\\ud800", "text": "= \\udfff =\\nparagraph \\ud800"}]', encoding='utf-8')
+    record = json.loads(path.read_text(encoding='utf-8'))[0]
+
+    with BinarySink(tmp_path / 'documents.bin') as sink:
+        assert ingest(path, sink, workers=1).records == 1
+    with open(tmp_path / 'documents.bin', 'rb') as fp:
+        assert list(iter_binary(fp)) == [({'title': record['title']}, Parser().parse(record['text']))]
+
+    with JSONLinesSink(tmp_path / 'documents.jsonl') as sink:
+        assert ingest(path, sink, workers=1).records == 1
+    written = json.loads((tmp_path / 'documents.jsonl').read_text(encoding='utf-8'))
+    assert written['title'] == record['title']
+    assert written['document']['children'][0]['children'] == ['\udfff']
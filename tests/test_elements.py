@@ -0,0 +1,170 @@
+import io
+import pickle
+
+import pytest
+
+from namumark.elements import *
+from namumark.elements import serialization
+
+
+def test_slots():
+    for element in [Document(), Heading(1), Quote(), Paragraph(), UnorderedList(),
+                    OrderedList(1, '1'), ListItem(), Indentation(), ThematicBreak()]:
+        assert not hasattr(element, '__dict__')
+
+    # Children are allocated lazily
+    assert ThematicBreak().children == ()
+    assert Paragraph().append('text').children == ['text']
+
+
+def test_equality():
+    assert Heading(1, 'heading') == Heading(1, 'heading')
+    assert Heading(1, 'heading') != Heading(2, 'heading')
+    assert OrderedList(1, 'a', ListItem()) != OrderedList(1, 'A', ListItem())
+    assert Quote(Paragraph('quote')) != Quote(Paragraph('quote'), Paragraph('quote'))
+    assert Quote() != Indentation()
+
+    document = Document(Heading(1, 'heading'), OrderedList(10, 'i', ListItem(Paragraph('item'))))
+    assert pickle.loads(pickle.dumps(document)) == document
+
+
+def test_repr():
+    assert repr(OrderedList(10, 'i')).endswith('(bullet=\'i\', closed=False, start=10)')
+    assert Document(ThematicBreak()).dump().splitlines()[1].startswith('  ThematicBreak#')
+
+
+def test_arena():
+    document = Document(
+        Heading(2, 'heading'),
+        Quote(
+            Paragraph('quote 1', 'quote 1'),
+            OrderedList(10, 'i', ListItem(Paragraph('item')))),
+        ThematicBreak())
+    arena = ArenaDocument.from_document(document)
+
+    assert len(arena) == 12
+    assert arena.to_document() == document
+    assert arena == document
+    assert document == arena
+    assert document.children[1] == arena.root.children[1]
+    assert pickle.loads(pickle.dumps(arena)) == document
+
+    root = arena.root
+    heading, quote, thematic_break = root.children
+    assert heading.element_class is Heading
+    assert (heading.level, heading.closed, heading.first_child) == (2, True, 'heading')
+    assert heading.parent.index == root.index
+    assert quote.last_child.start == 10
+    assert quote.last_child.bullet == 'i'
+    assert list(quote.first_child) == ['quote 1', 'quote 1']
+    assert thematic_break.first_child is None
+    assert quote.last_child == document.children[1].last_child
+
+    assert [node.index for node in arena.iter_nodes(Paragraph)] == [4, 9]
+
+    # The syntax allows starts out of the range of 64-bit integers
+    document = Document(OrderedList(10 ** 20, '1', ListItem(Paragraph('item'))), OrderedList(7, '1'))
+    arena = ArenaDocument.from_document(document)
+    assert arena.root.first_child.start == 10 ** 20
+    assert pickle.loads(pickle.dumps(arena)) == document
+
+
+def test_to_bytes():
+    document = Document(
+        Heading(2, 'heading'),
+        Quote(
+            Paragraph('quote 1', 'quote 1'),
+            OrderedList(-300, 'I', ListItem(Paragraph('항목')))),
+        ThematicBreak())
+    document.children[1].closed = True
+
+    data = document.to_bytes()
+    decoded = Document.from_bytes(data)
+    assert decoded == document
+    assert decoded.last_child.parent is decoded
+    assert decoded.children[1].last_child.start == -300
+    assert Document.from_bytes(bytearray(data)) == document
+    assert Document.from_bytes(Document().to_bytes()) == Document()
+
+    corrupted = data.replace(b'start', b'xtart')  # an attribute name in the kind table
+    for invalid in [b'', data[:-1], data + b'\x00', b'NMKB\x7f', serialization.encode(Quote()), corrupted]:
+        with pytest.raises(ValueError):
+            Document.from_bytes(invalid)
+
+    # Lone surrogates, which JSON escapes can give, are kept as they are
+    document = Document(Paragraph('a \ud800', '\ud83d', '\ude00 😀'))
+    decoded = Document.from_bytes(document.to_bytes())
+    assert decoded == document
+    assert decoded.last_child.children == ['a \ud800', '\ud83d', '\ude00 😀']
+
+
+def test_copy():
+    document = Document(
+        Heading(2, 'heading'),
+        OrderedList(10, 'i', ListItem(Paragraph('item'))))
+    copied = document.copy()
+
+    assert copied == document
+    assert copied.parent is None
+    assert copied.last_child.parent is copied
+    assert copied.last_child is not document.last_child
+
+    copied.last_child.closed = True
+    assert not document.last_child.closed
+
+
+def test_structural_hash():
+    document = Document(Heading(2, 'heading'), Quote(Paragraph('quote')))
+    same = Document(Heading(2, 'heading'), Quote(Paragraph('quote')))
+    same.last_child.closed = True
+
+    assert document.structural_hash() == same.structural_hash()
+    assert document.structural_hash() != Document(Heading(3, 'heading')).structural_hash()
+
+    # Changes through append and prepend invalidate hashes of ancestors
+    paragraph = same.last_child.last_child
+    paragraph.append('more')
+    assert same._hash is None
+    assert document.structural_hash() != same.structural_hash()
+    assert document != same
+
+    # Deep elements are compared without recursion
+    deep, other = Quote(), Quote()
+    for root in [deep, other]:
+        current = root
+        for _ in range(10000):
+            current.append(Quote())
+            current = current.last_child
+        current.append('text')
+    assert deep == other
+    assert deep.structural_hash() == other.structural_hash()
+
+
+def test_traversal():
+    document = Document(Heading(1, 'heading'), Quote(Paragraph('text')))
+    heading, quote = document.children
+    paragraph = quote.first_child
+
+    assert list(preorder(document)) == [document, heading, 'heading', quote, paragraph, 'text']
+    assert list(postorder(document)) == ['heading', heading, 'text', paragraph, quote, document]
+    assert list(iter_type(document, Block)) == [document, heading, quote, paragraph]
+    assert list(iter_type(document, Paragraph)) == [paragraph]
+
+
+def test_dump():
+    document = Document(Heading(1, 'heading'), Quote(Paragraph('text')))
+    lines = document.dump(indent=1).split('\n')
+    assert [len(line) - len(line.lstrip()) for line in lines] == [0, 1, 2, 1, 2, 3]
+    assert lines[-1] == "   'text'"
+
+    stream = io.StringIO()
+    assert document.dump(indent=1, stream=stream) is None
+    assert stream.getvalue() == document.dump(indent=1)
+
+    # Deep elements are dumped without recursion
+    deep = Quote()
+    current = deep
+    for _ in range(10000):
+        current.append(Quote())
+        current = current.last_child
+    assert deep.dump().count('\n') == 10000
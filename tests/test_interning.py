@@ -0,0 +1,48 @@
+from namumark import Interner, Parser
+from namumark.elements import *
+
+
+def test_interner():
+    interner = Interner()
+    source = '== 개요 ==\nparagraph\n----\n> quote\n----\n * item'
+
+    first = Parser().parse(source, interner=interner)
+    second = Parser().parse(source, interner=interner)
+    assert first == second == Parser().parse(source)
+
+    # Closed blocks are shared, and open ones are not
+    assert second.children[0] is first.children[0]
+    assert first.children[2] is first.children[4]
+    assert second.children[0].parent is None
+    assert second.last_child is not first.last_child
+    assert second.last_child.parent is second
+
+    parents = {id(node): parent for node, parent in walk(second)}
+    assert parents[id(second.children[2])] is second
+    assert parents[id(second.children[3].first_child)] is second.children[3]
+
+
+def test_interner_with_sections():
+    interner = Interner()
+    source = '== 개요 ==\nparagraph\n== 역사 ==\n----'
+
+    Parser().parse(source, interner=interner)
+    document = Parser().parse(source, interner=interner)
+
+    # Sections refer to the shared headings which the document has
+    assert [section.heading for section in document.sections] == [document.children[0], document.children[2]]
+    assert document.sections[0].heading is document.children[0]
+    assert [section.line_start for section in document.sections] == [0, 2]
+
+
+def test_walk():
+    document = Document(Heading(1, 'heading'), Paragraph('text'))
+    heading, paragraph = document.children
+
+    assert list(walk(document)) == [
+        (document, None),
+        (heading, document),
+        ('heading', heading),
+        (paragraph, document),
+        ('text', paragraph),
+    ]
@@ -0,0 +1,314 @@
+import asyncio
+import io
+import mmap
+import time
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import pytest
+
+import namumark
+from namumark import BlockMemo, Edit, HeadingIndex, Parser
+from namumark.elements import *
+from namumark.events import *
+from namumark.parser import iterate_byte_lines, iterate_lines
+
+
+source = '\n'.join([
+    '= heading 1 =',
+    '> quote 1',
+    '>> quote 2',
+    ' * unordered list item 1',
+    ' unordered list item 1',
+    '',
+    'paragraph',
+    '',
+])
+
+
+def closed(block):
+    block.closed = True
+    return block
+
+
+def test_parse_lines():
+    expected = Parser().parse(source)
+
+    assert Parser().parse_lines(source.split('\n')) == expected
+    assert Parser().parse_lines(source.splitlines(keepends=True) + ['']) == expected
+    assert Parser().parse_lines(
+        line for line in source.replace('\n', '\r\n').split('\r\n')) == expected
+
+
+def test_parse_file():
+    for newline in ['\n', '\r\n', '\r']:
+        text = source.replace('\n', newline)
+        expected = Parser().parse(text)
+
+        assert Parser().parse_file(io.StringIO(text, newline='')) == expected
+        assert Parser().parse_file(io.StringIO(text, newline=None)) == expected
+
+    assert Parser().parse_file(io.StringIO('')) == Parser().parse('')
+    assert Parser().parse_file(io.StringIO('> quote')) == Parser().parse('> quote')
+
+
+def test_iter_blocks():
+    assert list(Parser().iter_blocks(source)) == Parser().parse(source).children
+    assert list(Parser().iter_blocks('')) == []
+
+    blocks = Parser().iter_blocks('= heading 1 =\nparagraph\n= heading 1 =')
+    assert next(blocks) == Heading(1, 'heading 1')
+    assert next(blocks) == closed(Paragraph('paragraph'))
+    assert next(blocks).parent is None
+
+
+def test_iter_events():
+    assert list(Parser().iter_events(
+        '== heading 2 ==\n'
+        '> quote 1\n'
+        '> quote 1\n'
+        ' 1.#10 ordered list item 1'
+    )) == [
+        Open(Document, {}),
+        Open(Heading, {'level': 2}),
+        Text('heading 2'),
+        Close(Heading),
+        Open(Quote, {}),
+        Open(Paragraph, {}),
+        Text('quote 1'),
+        Text('quote 1'),
+        Close(Paragraph),
+        Close(Quote),
+        Open(OrderedList, {'start': 10, 'bullet': '1'}),
+        Open(ListItem, {}),
+        Open(Paragraph, {}),
+        Text('ordered list item 1'),
+        Close(Paragraph),
+        Close(ListItem),
+        Close(OrderedList),
+        Close(Document),
+    ]
+
+
+def test_parse_events():
+    collector = EventCollector()
+    Parser().parse_events(source, collector)
+
+    assert collector.events == list(Parser().iter_events(source))
+
+
+def test_reparse():
+    parser = Parser()
+    document = parser.parse(source, keep_lines=True)
+    quote = document.children[1]
+    paragraph = document.children[-1]
+
+    # Edits inside a block reparse only the block
+    parser.reparse(document, Edit(2, 3, ['>> quote 3', '> quote 4']))
+    expected = Parser().parse(source.replace('>> quote 2', '>> quote 3\n> quote 4'))
+    assert document == expected
+    assert document.children[1] is not quote
+    assert document.children[-1] is paragraph
+
+    # Edits may merge blocks following them
+    parser.reparse(document, Edit(0, 1, ['* item']))
+    assert document == Parser().parse('\n'.join(document._lines))
+    assert all(child.parent is document for child in document)
+
+    with pytest.raises(ValueError):
+        parser.reparse(Parser().parse(source), Edit(0, 0, []))
+    with pytest.raises(ValueError):
+        parser.reparse(document, Edit(2, 1, []))
+
+
+def test_parse_with_memo():
+    memo = BlockMemo()
+    page = source + '= heading 2 =\nparagraph 2\n----\n* item\n= heading 3 ='
+    revisions = [
+        page,
+        page.replace('paragraph 2', 'paragraph 3'),
+        page.replace('quote 2', 'quote 3'),
+    ]
+
+    for revision in revisions:
+        document = Parser().parse(revision, memo=memo)
+        assert document == Parser().parse(revision)
+        assert all(child.parent is document for child in document)
+
+    # Only the runs changed by revisions are parsed
+    assert (memo.hits, memo.misses) == (6, 6)
+
+
+def test_sections():
+    text = '\n'.join([
+        '== 개요 ==',
+        'paragraph',
+        '=== 역사 ===',
+        '> quote',
+        '==== 초기 ====',
+        '== 평가 ==',
+        ' * item',
+    ])
+    document = Parser().parse(text)
+    sections = document.sections
+
+    assert [section.number for section in sections] == ['1', '1.1', '1.1.1', '2']
+    assert [section.title for section in sections] == ['개요', '역사', '초기', '평가']
+
+    history = sections.by_title('역사')
+    assert history is sections.by_path('1.1') is sections.by_path((1, 1))
+    assert history.heading is document.children[2]
+    assert (history.start, history.stop) == (2, 5)
+    assert (history.line_start, history.line_stop) == (2, 5)
+    assert (sections[-1].stop, sections[-1].line_stop) == (7, 7)
+    assert sections.by_path('3') is None
+    assert sections.by_title('기타') is None
+
+    # Documents built otherwise are indexed on demand
+    decoded = Document.from_bytes(document.to_bytes())
+    assert [section.path for section in decoded.sections] == [section.path for section in sections]
+    assert decoded.sections[0].line_start is None
+
+
+def test_partial_parse():
+    text = '\n'.join([
+        'lead',
+        '== 개요 ==',
+        '> quote',
+        '=== 역사 ===',
+        ' * item',
+        '== 평가 ==',
+        'paragraph',
+    ])
+
+    document = Parser().parse(text, stop_after_sections=1)
+    assert document.truncated
+    assert document == Parser().parse(text, max_lines=5)
+    assert [section.number for section in document.sections] == ['1', '1.1']
+    assert (document.sections[0].stop, document.sections[0].line_stop) == (5, 5)
+    assert all(child.closed for child in document)
+
+    document = Parser().parse(text, until=lambda line: line.startswith('>'))
+    assert document.truncated
+    assert document == Document(closed(Paragraph('lead')), Heading(2, '개요'))
+
+    assert not Parser().parse(text, max_lines=7).truncated
+    assert not Parser().parse(text, stop_after_sections=2).truncated
+    assert Parser().parse(text, max_lines=7) == Parser().parse(text)
+
+    with pytest.raises(ValueError):
+        Parser().parse(text, keep_lines=True, max_lines=1)
+
+
+def test_parse_section():
+    text = '\r\n'.join([
+        'lead',
+        '== 개요 ==',
+        '> quote',
+        '=== 역사 ===',
+        '== 평가 ==',
+        ' * item',
+        '* list item',
+        '== not a section ==',
+    ])
+    full = Parser().parse(text)
+
+    index = HeadingIndex.scan(text)
+    assert list(index.lines) == [1, 3, 4]
+    assert list(index.levels) == [2, 3, 2]
+    assert HeadingIndex.from_bytes(index.to_bytes()).offsets == index.offsets
+
+    for number, section in enumerate(full.sections):
+        document = Parser().parse_section(text, index, number)
+        assert document.truncated
+        assert document.children == full.children[section.start:section.stop]
+
+    with pytest.raises(ValueError):
+        Parser().parse_section(text + 'more', index, 0)
+
+
+def test_parse_parallel():
+    text = '\n'.join([
+        'paragraph',
+        '',
+        'continued after a blank line',
+        '== heading ==',
+        '> quote',
+        '----',
+        ' * item',
+        '* list item',
+        'in the list item',
+        '== in the list item ==',
+        '1. another list item',
+    ] * 3)
+    expected = Parser().parse(text)
+
+    document = Parser().parse_parallel(text, workers=2, min_chunk_lines=1)
+    assert document == expected
+    assert [section.line_start for section in document.sections] == [
+        section.line_start for section in expected.sections]
+
+    assert Parser().parse_parallel('paragraph', workers=2) == Parser().parse('paragraph')
+
+    # Any executor can be given, not only a pool of the standard library
+    class InlineExecutor(Executor):
+        def submit(self, function, *args):
+            future = Future()
+            future.set_result(function(*args))
+            return future
+
+    assert Parser().parse_parallel(text, workers=4, executor=InlineExecutor(), min_chunk_lines=1) == expected
+
+    # Chunks are sent back encoded, with lone surrogates as they are
+    text = '= \ud800 =\nparagraph\n== heading ==\nparagraph \udfff'
+    assert Parser().parse_parallel(text, workers=4, executor=InlineExecutor(), min_chunk_lines=1) == Parser().parse(text)
+
+
+def test_parse_async():
+    text = source + '\r= heading after a carriage return =\n'
+
+    async def parse(**options):
+        reader = asyncio.StreamReader()
+        reader.feed_data(text.encode('utf-8'))
+        reader.feed_eof()
+
+        return await Parser().parse_async(reader, **options)
+
+    assert asyncio.run(parse(yield_lines=1)) == Parser().parse(text)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(parse(yield_lines=1, deadline=time.monotonic()))
+
+
+def test_parse_concurrently():
+    sources = ['= heading {} =\n> quote\n * item {}\nparagraph'.format(index, index) for index in range(100)]
+    expected = [Parser().parse(text) for text in sources]
+
+    parser = Parser()
+
+    def parse(index):
+        text = sources[index % len(sources)]
+        if index % 2:
+            return parser.parse(text).children
+        return list(parser.iter_blocks(text))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for index, children in enumerate(executor.map(parse, range(2000))):
+            assert children == expected[index % len(sources)].children
+
+    assert namumark.parse(sources[0]) == expected[0]
+
+
+def test_parse_bytes(tmp_path):
+    text = source + '\r\n= 제목 =\r문단\n'
+    data = text.encode('utf-8')
+    expected = Parser().parse(text)
+
+    assert Parser().parse_bytes(data) == expected
+    assert Parser().parse_bytes(memoryview(data)) == expected
+    assert list(iterate_byte_lines(data, chunk_size=1)) == list(iterate_lines(text))
+
+    path = tmp_path / 'page.txt'
+    path.write_bytes(data)
+    with open(path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        assert Parser().parse_bytes(buffer) == expected